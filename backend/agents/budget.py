@@ -1,56 +1,56 @@
 """
 Budget Agent - Analyzes costs and validates against user budget
 """
-import json
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
 from tools import estimate_costs
-from core.config import settings
+from core.config import get_settings
+from core.llm import get_llm
+from core.utils import (
+    compact_tool_result, is_final_answer, message_text, run_tool_call, tool_call_signature
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+BUDGET_SYSTEM_PROMPT = """You are a Budget Analysis Agent with access to REAL COST DATA.
+Your role is to analyze trip costs using actual, current pricing information.
+
+Use the available tools to:
+1. Estimate travel costs based on real 2024 data (use estimate_costs tool)
+2. Calculate total trip costs
+3. Compare with user budget
+4. Provide realistic recommendations
+
+Be realistic and transparent about costs using current market rates.
+"""
+
 
 class BudgetAgent:
     """Agent responsible for cost analysis and budget validation"""
     
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.LLM_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS,
-            google_api_key=settings.GOOGLE_API_KEY
-        )
+    def __init__(self, llm: Optional[ChatGoogleGenerativeAI] = None):
+        self.llm = llm or get_llm()
         self.tools = [estimate_costs]
         self.llm_with_tools = self.llm.bind_tools(self.tools)
+        self._tool_map = {t.name: t for t in self.tools}
         logger.info("Budget Agent initialized")
     
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute budget analysis phase
         
         Args:
-            state: Current trip planning state with research data
+            state: Current trip planning state
         
         Returns:
             Updated state with budget analysis
         """
-        logger.info(f"Budget Agent executing for {state['destination']}")
-        
-        system_message = SystemMessage(content="""You are a Budget Analysis Agent with access to REAL COST DATA.
-        Your role is to analyze trip costs using actual, current pricing information.
+        logger.info("Budget Agent executing for %s", state['destination'])
         
-        Use the available tools to:
-        1. Estimate travel costs based on real 2024 data (use estimate_costs tool)
-        2. Calculate total trip costs
-        3. Compare with user budget
-        4. Provide realistic recommendations
-        
-        Be realistic and transparent about costs using current market rates.
-        """)
-        
-        research_summary = json.dumps(state.get('research_data', {}), indent=2)[:500]
+        system_message = SystemMessage(content=BUDGET_SYSTEM_PROMPT)
         
         user_message = HumanMessage(content=f"""Analyze the budget for this trip using REAL COST DATA:
         
@@ -58,8 +58,7 @@ class BudgetAgent:
         Duration: {state['num_days']} days
         Travel style: {state['travel_style']}
         User budget: ${state['budget_usd']} USD
-        
-        Research data summary: {research_summary}...
+        Interests: {', '.join(state['interests'])}
         
         Please:
         1. Use estimate_costs tool to get REAL cost estimates
@@ -69,59 +68,73 @@ class BudgetAgent:
         5. Suggest ways to optimize spending if over budget
         """)
         
+        settings = get_settings()
         messages = [system_message, user_message]
         budget_results = {}
         
+        tool_cache: Dict[tuple, asyncio.Task] = {}
+        last_tool_signature = None
+        
         # Agent reasoning loop
         for i in range(3):  # Budget agent needs fewer iterations
             try:
-                response = self.llm_with_tools.invoke(messages)
+                response = await self.llm_with_tools.ainvoke(messages)
+                
+                tool_signature = tool_call_signature(response)
+                if tool_signature and tool_signature == last_tool_signature:
+                    logger.info("Agent repeated identical tool calls, stopping")
+                    break
+                last_tool_signature = tool_signature
                 messages.append(response)
                 
                 if response.tool_calls:
-                    logger.info(f"Agent calling {len(response.tool_calls)} tool(s)")
+                    logger.debug("Agent calling %s tool(s)", len(response.tool_calls))
+                    
+                    # Execute independent tool calls concurrently
+                    tool_results = await asyncio.gather(
+                        *(run_tool_call(tool_call, self._tool_map, tool_cache) for tool_call in response.tool_calls)
+                    )
                     
-                    for tool_call in response.tool_calls:
+                    # Record results in the order the LLM requested them
+                    for tool_call, tool_result in zip(response.tool_calls, tool_results):
                         tool_name = tool_call['name']
-                        tool_args = tool_call['args']
                         
-                        logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
-                        
-                        # Execute tool
-                        tool_func = next(t for t in self.tools if t.name == tool_name)
-                        tool_result = tool_func.invoke(tool_args)
-                        
-                        # Add tool result to messages
-                        messages.append(AIMessage(content=f"Tool {tool_name} result: {tool_result}"))
+                        # Reply to the tool call with a structured tool message
+                        messages.append(ToolMessage(
+                            content=compact_tool_result(tool_result, settings.TOOL_MESSAGE_MAX_CHARS),
+                            tool_call_id=tool_call['id'],
+                            name=tool_name
+                        ))
                         
                         # Store in budget results
-                        budget_results[f"{tool_name}_{i}"] = json.loads(tool_result) if isinstance(tool_result, str) else tool_result
+                        budget_results[f"{tool_name}_{i}"] = tool_result
                 else:
                     logger.info("Agent finished tool calls")
                     break
                     
             except Exception as e:
-                logger.error(f"Error in budget agent iteration {i}: {e}")
+                logger.error("Error in budget agent iteration %s: %s", i, e)
                 break
         
         # Final budget analysis
-        summary_prompt = HumanMessage(content="Provide a final budget analysis with REAL cost data and recommendations. Be specific about whether the trip fits within budget.")
-        messages.append(summary_prompt)
-        
         try:
-            final_response = self.llm.invoke(messages)
+            if is_final_answer(messages[-1]):
+                # The last reply already is the summary; skip another round-trip
+                final_response = messages[-1]
+            else:
+                summary_prompt = HumanMessage(content="Provide a final budget analysis with REAL cost data and recommendations. Be specific about whether the trip fits within budget.")
+                messages.append(summary_prompt)
+                final_response = await self.llm.ainvoke(messages)
             logger.info("Budget analysis completed successfully")
             
             return {
-                "messages": [final_response],
-                "budget_analysis": budget_results,
-                "next_agent": "planner"
+                "messages": [message_text(final_response, settings.AGENT_SUMMARY_MAX_CHARS)],
+                "budget_analysis": budget_results
             }
         except Exception as e:
-            logger.error(f"Error generating budget summary: {e}")
+            logger.error("Error generating budget summary: %s", e)
             return {
                 "messages": [],
                 "budget_analysis": budget_results,
-                "next_agent": "planner",
                 "error": str(e)
             }
@@ -1,30 +1,133 @@
 """
 Planner Agent - Creates detailed day-by-day itineraries
 """
-import json
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from datetime import datetime
+from google.api_core.exceptions import NotFound, PermissionDenied
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.exceptions import OutputParserException
 from langchain_core.messages import HumanMessage, SystemMessage
-from core.config import settings
+from langchain_core.output_parsers.openai_tools import PydanticToolsParser
+from pydantic import ValidationError
+from core.llm import get_llm, get_cached_llm, refresh_cached_llm
+from core.utils import summarize_dict
+from models.schemas import ItineraryDraft
 import logging
 
 logger = logging.getLogger(__name__)
 
+PLANNER_SYSTEM_PROMPT = """You are a Trip Planner creating detailed itineraries.
+
+Return the itinerary by calling the ItineraryDraft function.
+
+Rules:
+1. Create 3-5 activities per day
+2. Use realistic costs and timing
+3. Match user interests
+4. Calculate total_cost accurately
+5. Set budget_status to "within_budget" if total_cost <= budget, else "over_budget"
+"""
+
+
+def _fallback_itinerary(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a simple evenly-budgeted itinerary when the LLM output is unusable"""
+    daily_budget = state['budget_usd'] / state['num_days']
+    return {
+        "day_plans": [{
+            "day": i + 1,
+            "activities": [{
+                "name": "Explore destination",
+                "time": "9:00 AM - 6:00 PM",
+                "duration_hours": 8.0,
+                "cost_usd": daily_budget,
+                "description": "Planned activities for the day",
+                "reasoning": "Based on research and budget analysis"
+            }],
+            "daily_cost": daily_budget,
+            "summary": f"Day {i + 1} activities"
+        } for i in range(state['num_days'])],
+        "total_cost": state['budget_usd'],
+        "budget_status": "within_budget",
+        "recommendations": ["Check the full itinerary text for details"]
+    }
+
 
 class PlannerAgent:
     """Agent responsible for creating detailed trip itineraries"""
     
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.LLM_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS,
-            google_api_key=settings.GOOGLE_API_KEY
-        )
+    def __init__(self, llm: Optional[ChatGoogleGenerativeAI] = None):
+        self.llm = llm or get_llm()
+        self.llm_json = self.llm.with_structured_output(ItineraryDraft)
+        # Model with the system prompt and schema held in a Gemini context
+        # cache, if enabled; the schema can't be re-sent alongside a cache.
+        # Creating the cache blocks, so it happens on first use in a thread
+        self._cache_pending = llm is None
+        self._cached_llm: Optional[ChatGoogleGenerativeAI] = None
+        self.cached_llm_json = None
+        self._cache_lock = asyncio.Lock()
         logger.info("Planner Agent initialized")
     
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _set_cached_llm(self, cached_llm: Optional[ChatGoogleGenerativeAI]) -> None:
+        """Store the context-cached model and its structured-output chain"""
+        self._cached_llm = cached_llm
+        self.cached_llm_json = (
+            cached_llm | PydanticToolsParser(tools=[ItineraryDraft], first_tool_only=True)
+            if cached_llm else None
+        )
+    
+    async def _get_cached_llm_json(self):
+        """Get the context-cached chain, creating the cache on first use"""
+        if self._cache_pending:
+            async with self._cache_lock:
+                if self._cache_pending:
+                    self._set_cached_llm(await asyncio.to_thread(
+                        get_cached_llm, PLANNER_SYSTEM_PROMPT, ItineraryDraft
+                    ))
+                    self._cache_pending = False
+        return self.cached_llm_json
+    
+    async def _refresh_context_cache(self, failed_llm_json) -> None:
+        """Recreate the context cache once, however many requests saw it fail"""
+        async with self._cache_lock:
+            if self.cached_llm_json is failed_llm_json:
+                self._set_cached_llm(await asyncio.to_thread(
+                    refresh_cached_llm,
+                    PLANNER_SYSTEM_PROMPT,
+                    ItineraryDraft,
+                    self._cached_llm.cached_content
+                ))
+    
+    async def _generate_draft(
+        self,
+        system_message: SystemMessage,
+        user_message: HumanMessage
+    ) -> Optional[ItineraryDraft]:
+        """
+        Generate the itinerary draft, through the context cache when available
+        
+        Args:
+            system_message: Planner system prompt
+            user_message: Trip-specific request
+        
+        Returns:
+            Validated itinerary draft
+        """
+        cached_llm_json = await self._get_cached_llm_json()
+        if cached_llm_json:
+            try:
+                # System prompt is already part of the cached context
+                return await cached_llm_json.ainvoke([user_message])
+            except (NotFound, PermissionDenied) as e:
+                # Gemini reports an expired (TTL) cache as missing; recreate it
+                # for later requests and answer this one uncached. Other errors,
+                # e.g. a transient 429/503, propagate and keep the cache
+                logger.warning("Context cache unavailable, resending full prompt: %s", e)
+                await self._refresh_context_cache(cached_llm_json)
+        
+        return await self.llm_json.ainvoke([system_message, user_message])
+    
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute itinerary planning phase
         
@@ -34,47 +137,12 @@ class PlannerAgent:
         Returns:
             Updated state with complete itinerary
         """
-        logger.info(f"Planner Agent executing for {state['destination']}")
+        logger.info("Planner Agent executing for %s", state['destination'])
         
-        system_message = SystemMessage(content="""You are a Trip Planner creating detailed itineraries.
-
-CRITICAL: You MUST respond with ONLY valid JSON. No other text before or after the JSON.
-
-Create a JSON object with this EXACT structure:
-{
-  "day_plans": [
-    {
-      "day": 1,
-      "activities": [
-        {
-          "name": "Visit Eiffel Tower",
-          "time": "9:00 AM - 12:00 PM",
-          "duration_hours": 3.0,
-          "cost_usd": 25.0,
-          "description": "Explore the iconic landmark and enjoy panoramic views",
-          "reasoning": "Perfect for culture and landmarks interest"
-        }
-      ],
-      "daily_cost": 150.0,
-      "summary": "Exploring iconic Paris landmarks"
-    }
-  ],
-  "total_cost": 450.0,
-  "budget_status": "within_budget",
-  "recommendations": ["Book Eiffel Tower tickets in advance", "Try local cafes"]
-}
-
-Rules:
-1. Create 3-5 activities per day
-2. Use realistic costs and timing
-3. Match user interests
-4. Calculate total_cost accurately
-5. Set budget_status to "within_budget" if total_cost <= budget, else "over_budget"
-6. Respond with ONLY the JSON object, nothing else
-""")
+        system_message = SystemMessage(content=PLANNER_SYSTEM_PROMPT)
         
-        research_data = json.dumps(state.get('research_data', {}), indent=2)[:1000]
-        budget_data = json.dumps(state.get('budget_analysis', {}), indent=2)[:500]
+        research_data = summarize_dict(state.get('research_data', {}), 1000)
+        budget_data = summarize_dict(state.get('budget_analysis', {}), 500)
         
         
         user_message = HumanMessage(content=f"""Plan a {state['num_days']}-day trip to {state['destination']}.
@@ -88,67 +156,25 @@ Budget Data: {budget_data}
 
 Create {state['num_days']} days of activities. Each day should have 3-5 activities.
 Calculate costs realistically and ensure total_cost <= ${state['budget_usd']}.
-
-IMPORTANT: Respond with ONLY the JSON object. No explanations, no markdown, just pure JSON.
 """)
         
-        messages = [system_message, user_message]
-        
-        
         try:
-            # Generate itinerary
-            response = self.llm.invoke(messages)
-            logger.info("Itinerary generated successfully")
-            
-            # Parse JSON response
+            # Generate itinerary as a validated schema object
             try:
-                # Try to extract JSON from the response
-                content = response.content.strip()
-                logger.info(f"LLM response length: {len(content)} characters")
-                logger.info(f"LLM response preview: {content[:200]}...")
-                
-                # Handle markdown code blocks
-                if "```" in content:
-                    # Find JSON between code fences
-                    import re
-                    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
-                    if json_match:
-                        content = json_match.group(1)
-                        logger.info("Extracted JSON from markdown code block")
-                    else:
-                        # Try to find any JSON object
-                        json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                        if json_match:
-                            content = json_match.group(0)
-                            logger.info("Extracted JSON object from response")
-                
-                itinerary_data = json.loads(content)
-                logger.info("Successfully parsed JSON itinerary")
-                logger.info(f"Parsed data keys: {list(itinerary_data.keys())}")
-                
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse JSON from LLM response: {e}")
-                logger.warning(f"Content that failed to parse: {content[:500]}")
-                # Fallback: create a simple structured itinerary
-                itinerary_data = {
-                    "day_plans": [{
-                        "day": i + 1,
-                        "activities": [{
-                            "name": "Explore destination",
-                            "time": "9:00 AM - 6:00 PM",
-                            "duration_hours": 8.0,
-                            "cost_usd": state['budget_usd'] / state['num_days'],
-                            "description": "Planned activities for the day",
-                            "reasoning": "Based on research and budget analysis"
-                        }],
-                        "daily_cost": state['budget_usd'] / state['num_days'],
-                        "summary": f"Day {i + 1} activities"
-                    } for i in range(state['num_days'])],
-                    "total_cost": state['budget_usd'],
-                    "budget_status": "within_budget",
-                    "recommendations": ["Check the full itinerary text for details"]
-                }
+                draft = await self._generate_draft(system_message, user_message)
+            except (OutputParserException, ValidationError) as e:
+                logger.warning("LLM returned an invalid itinerary: %s", e)
+                draft = None
             
+            error = None
+            if draft is not None:
+                itinerary_data = draft.model_dump()
+                logger.info("Itinerary generated successfully")
+            else:
+                logger.warning("No structured itinerary returned, using fallback")
+                itinerary_data = _fallback_itinerary(state)
+                # Flagged so the placeholder plan is reported and never cached
+                error = "Planner returned no usable itinerary; showing a placeholder plan"
             
             # Structure the complete itinerary with all required fields
             itinerary = {
@@ -163,23 +189,21 @@ IMPORTANT: Respond with ONLY the JSON object. No explanations, no markdown, just
                 "created_at": datetime.now().isoformat()
             }
             
-            logger.info(f"Constructed itinerary with {len(itinerary.get('day_plans', []))} day plans")
-            logger.info(f"Itinerary keys: {list(itinerary.keys())}")
+            logger.info("Constructed itinerary with %s day plans", len(itinerary.get('day_plans', [])))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Itinerary keys: %s", list(itinerary.keys()))
             
             result = {
-                "messages": [response],
                 "itinerary": itinerary,
                 "next_agent": "END"
             }
+            if error:
+                result["error"] = error
             
-            logger.info(f"Returning result with keys: {list(result.keys())}")
             return result
             
         except Exception as e:
-            logger.error(f"Error generating itinerary: {e}")
-            logger.error(f"Exception type: {type(e).__name__}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error generating itinerary: %s", e)
             return {
                 "messages": [],
                 "itinerary": {},
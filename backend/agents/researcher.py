@@ -1,32 +1,43 @@
 """
 Researcher Agent - Gathers destination information using live APIs
 """
-import json
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from tools import search_attractions, calculate_distance
-from core.config import settings
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from tools import GeoContext, search_attractions, calculate_distance
+from core.config import get_settings
+from core.llm import get_llm
+from core.utils import (
+    compact_tool_result, is_final_answer, message_text, run_tool_call, tool_call_signature
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+RESEARCHER_SYSTEM_PROMPT = """You are a Destination Research Agent with access to LIVE DATA APIs.
+Your role is to gather real-time, accurate information about travel destinations.
+
+Use the available tools to:
+1. Search for real tourist attractions using search_attractions
+2. Calculate distances between locations if needed
+
+Provide detailed, factual, CURRENT information to help plan the trip.
+Focus on highly-rated attractions and realistic travel times.
+"""
+
 
 class ResearcherAgent:
     """Agent responsible for researching destinations and gathering attraction data"""
     
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.LLM_MODEL,
-            temperature=settings.LLM_TEMPERATURE,
-            max_tokens=settings.LLM_MAX_TOKENS,
-            google_api_key=settings.GOOGLE_API_KEY
-        )
+    def __init__(self, llm: Optional[ChatGoogleGenerativeAI] = None):
+        self.llm = llm or get_llm()
         self.tools = [search_attractions, calculate_distance]
         self.llm_with_tools = self.llm.bind_tools(self.tools)
+        self._tool_map = {t.name: t for t in self.tools}
         logger.info("Researcher Agent initialized")
     
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute research phase
         
@@ -36,18 +47,9 @@ class ResearcherAgent:
         Returns:
             Updated state with research data
         """
-        logger.info(f"Researcher Agent executing for {state['destination']}")
+        logger.info("Researcher Agent executing for %s", state['destination'])
         
-        system_message = SystemMessage(content="""You are a Destination Research Agent with access to LIVE DATA APIs.
-        Your role is to gather real-time, accurate information about travel destinations.
-        
-        Use the available tools to:
-        1. Search for real tourist attractions using search_attractions
-        2. Calculate distances between locations if needed
-        
-        Provide detailed, factual, CURRENT information to help plan the trip.
-        Focus on highly-rated attractions and realistic travel times.
-        """)
+        system_message = SystemMessage(content=RESEARCHER_SYSTEM_PROMPT)
         
         user_message = HumanMessage(content=f"""Research the destination: {state['destination']}
         
@@ -63,61 +65,78 @@ class ResearcherAgent:
         Provide a comprehensive summary of findings.
         """)
         
+        settings = get_settings()
         messages = [system_message, user_message]
         research_results = {}
         
+        tool_cache: Dict[tuple, asyncio.Task] = {}
+        last_tool_signature = None
+        # Geocode the destination while the LLM decides on its first tools
+        geo_task = asyncio.ensure_future(GeoContext.create(state['destination']))
+        
         # Agent reasoning loop
         for i in range(settings.MAX_AGENT_ITERATIONS):
             try:
-                response = self.llm_with_tools.invoke(messages)
+                response = await self.llm_with_tools.ainvoke(messages)
+                
+                tool_signature = tool_call_signature(response)
+                if tool_signature and tool_signature == last_tool_signature:
+                    logger.info("Agent repeated identical tool calls, stopping")
+                    break
+                last_tool_signature = tool_signature
                 messages.append(response)
                 
                 # Check if agent wants to use tools
                 if response.tool_calls:
-                    logger.info(f"Agent calling {len(response.tool_calls)} tool(s)")
+                    logger.debug("Agent calling %s tool(s)", len(response.tool_calls))
                     
-                    for tool_call in response.tool_calls:
+                    # Execute independent tool calls concurrently
+                    geo = await geo_task
+                    tool_results = await asyncio.gather(
+                        *(run_tool_call(tool_call, self._tool_map, tool_cache, geo.tool_kwargs) for tool_call in response.tool_calls)
+                    )
+                    
+                    # Record results in the order the LLM requested them
+                    for tool_call, tool_result in zip(response.tool_calls, tool_results):
                         tool_name = tool_call['name']
-                        tool_args = tool_call['args']
-                        
-                        logger.info(f"Calling tool: {tool_name} with args: {tool_args}")
                         
-                        # Execute tool
-                        tool_func = next(t for t in self.tools if t.name == tool_name)
-                        tool_result = tool_func.invoke(tool_args)
-                        
-                        # Add tool result to messages
-                        messages.append(AIMessage(content=f"Tool {tool_name} result: {tool_result}"))
+                        # Reply to the tool call with a structured tool message
+                        messages.append(ToolMessage(
+                            content=compact_tool_result(tool_result, settings.TOOL_MESSAGE_MAX_CHARS),
+                            tool_call_id=tool_call['id'],
+                            name=tool_name
+                        ))
                         
                         # Store in research results
-                        research_results[f"{tool_name}_{i}"] = json.loads(tool_result) if isinstance(tool_result, str) else tool_result
+                        research_results[f"{tool_name}_{i}"] = tool_result
                 else:
                     # No more tools to call, agent is done
                     logger.info("Agent finished tool calls")
                     break
                     
             except Exception as e:
-                logger.error(f"Error in researcher agent iteration {i}: {e}")
+                logger.error("Error in researcher agent iteration %s: %s", i, e)
                 break
         
         # Final summary from researcher
-        summary_prompt = HumanMessage(content="Based on your LIVE research, provide a concise summary of the destination and top recommendations with real data.")
-        messages.append(summary_prompt)
-        
         try:
-            final_response = self.llm.invoke(messages)
+            if is_final_answer(messages[-1]):
+                # The last reply already is the summary; skip another round-trip
+                final_response = messages[-1]
+            else:
+                summary_prompt = HumanMessage(content="Based on your LIVE research, provide a concise summary of the destination and top recommendations with real data.")
+                messages.append(summary_prompt)
+                final_response = await self.llm.ainvoke(messages)
             logger.info("Research phase completed successfully")
             
             return {
-                "messages": [final_response],
-                "research_data": research_results,
-                "next_agent": "budget"
+                "messages": [message_text(final_response, settings.AGENT_SUMMARY_MAX_CHARS)],
+                "research_data": research_results
             }
         except Exception as e:
-            logger.error(f"Error generating final summary: {e}")
+            logger.error("Error generating final summary: %s", e)
             return {
                 "messages": [],
                 "research_data": research_results,
-                "next_agent": "budget",
                 "error": str(e)
             }
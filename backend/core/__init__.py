@@ -1,3 +1,3 @@
-from .config import settings
+from .config import Settings, get_settings
 
-__all__ = ["settings"]
+__all__ = ["Settings", "get_settings"]
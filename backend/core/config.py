@@ -1,9 +1,9 @@
 """
 Configuration management using environment variables
 """
-from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import Optional
-import os
+from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -11,20 +11,24 @@ load_dotenv()
 class Settings(BaseSettings):
     """Application settings"""
     
-    # API Keys
-    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY","")
-    OPENTRIPMAP_API_KEY: str = os.getenv("OPENTRIPMAP_API_KEY", "")
-    GEOAPIFY_API_KEY: str = os.getenv("GEOAPIFY_API_KEY", "")
+    # API Keys (read from the environment or .env only)
+    GOOGLE_API_KEY: str = ""
+    OPENTRIPMAP_API_KEY: str = ""
+    GEOAPIFY_API_KEY: str = ""
     
     # LLM Settings
     LLM_MODEL: str = "gemini-2.5-flash"  # Stable model with good performance
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 2048
+    LLM_CONTEXT_CACHE_ENABLED: bool = False  # Cache static system prompts server-side
+    LLM_CONTEXT_CACHE_TTL: int = 3600  # seconds
+    LLM_TRANSPORT: Optional[str] = None  # None lets the client pick (async gRPC); or "rest"
     
     # API Settings
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_RELOAD: bool = True
+    WORKER_THREADS: int = 64  # Threads for blocking tool calls
     
     # CORS
     CORS_ORIGINS: list = ["http://localhost:8501", "http://localhost:3000"]
@@ -36,13 +40,31 @@ class Settings(BaseSettings):
     MAX_AGENT_ITERATIONS: int = 5
     AGENT_TIMEOUT: int = 300  # seconds
     
+    # Batch Settings
+    BATCH_MAX_SIZE: int = 20
+    BATCH_MAX_CONCURRENCY: int = 8
+    
+    # Result Cache Settings
+    RESULT_CACHE_SIZE: int = 512
+    RESULT_CACHE_TTL: int = 3600  # seconds
+    
     # Tool Settings
     SEARCH_RADIUS_KM: int = 10
     MAX_ATTRACTIONS: int = 15
+    TOOL_MESSAGE_MAX_CHARS: int = 400  # Tool result size echoed back to the LLM
+    AGENT_SUMMARY_MAX_CHARS: int = 2000  # Agent summary text kept in workflow state
+    TOOL_CACHE_SIZE: int = 256
+    TOOL_CACHE_TTL: int = 600  # seconds
+    OPENTRIPMAP_CACHE_SIZE: int = 1024  # Radius and detail responses
+    OPENTRIPMAP_CACHE_TTL: int = 3600  # seconds
     
     class Config:
         env_file = ".env"
         case_sensitive = True
 
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the application settings, parsed once per process"""
+    return Settings()
@@ -0,0 +1,149 @@
+"""
+Shared LLM client used by all agents
+"""
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional, Type
+from pydantic import BaseModel
+from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai._function_utils import convert_to_genai_function_declarations
+from core.config import get_settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _transport_kwargs() -> dict:
+    """
+    Transport override for ChatGoogleGenerativeAI, if one is configured
+
+    Passing transport="grpc" explicitly gives the async client the sync gRPC
+    transport, which breaks ainvoke; left unset, the library uses the
+    asyncio gRPC transport for async calls.
+
+    Returns:
+        {"transport": ...} when LLM_TRANSPORT is set, otherwise {}
+    """
+    transport = get_settings().LLM_TRANSPORT
+    return {"transport": transport} if transport else {}
+
+
+@lru_cache(maxsize=1)
+def get_llm() -> ChatGoogleGenerativeAI:
+    """
+    Get the process-wide Gemini chat model
+
+    All agents share this instance so they reuse one underlying client,
+    its auth state and its connection pool instead of opening their own.
+
+    Returns:
+        Configured ChatGoogleGenerativeAI instance
+    """
+    settings = get_settings()
+    llm = ChatGoogleGenerativeAI(
+        model=settings.LLM_MODEL,
+        temperature=settings.LLM_TEMPERATURE,
+        max_tokens=settings.LLM_MAX_TOKENS,
+        google_api_key=settings.GOOGLE_API_KEY,
+        **_transport_kwargs()
+    )
+    logger.info("Shared LLM client created for %s", settings.LLM_MODEL)
+    return llm
+
+
+@lru_cache(maxsize=8)
+def get_cached_llm(
+    system_prompt: str,
+    schema: Optional[Type[BaseModel]] = None
+) -> Optional[ChatGoogleGenerativeAI]:
+    """
+    Get a chat model bound to a Gemini context cache holding a system prompt
+
+    Requests made through the returned model must not include the system
+    prompt or tools again; Gemini prepends the cached prefix server-side.
+
+    Args:
+        system_prompt: Static system instruction to cache
+        schema: Optional output schema, cached as a function the model is
+            forced to call
+
+    Returns:
+        ChatGoogleGenerativeAI using the cached content, or None if caching
+        is disabled or the cache could not be created (e.g. the prompt is
+        below the model's minimum cacheable size)
+    """
+    settings = get_settings()
+    if not settings.LLM_CONTEXT_CACHE_ENABLED:
+        return None
+
+    try:
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        tool_kwargs = {}
+        if schema is not None:
+            tool_kwargs = {
+                "tools": [convert_to_genai_function_declarations([schema])],
+                "tool_config": {"function_calling_config": {
+                    "mode": "ANY",
+                    "allowed_function_names": [schema.__name__]
+                }}
+            }
+
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        cache = caching.CachedContent.create(
+            model=f"models/{settings.LLM_MODEL}",
+            system_instruction=system_prompt,
+            ttl=timedelta(seconds=settings.LLM_CONTEXT_CACHE_TTL),
+            **tool_kwargs
+        )
+    except Exception as e:
+        logger.warning("Context caching unavailable, sending full prompt: %s", e)
+        return None
+
+    logger.info("Created context cache %s", cache.name)
+    return ChatGoogleGenerativeAI(
+        model=settings.LLM_MODEL,
+        temperature=settings.LLM_TEMPERATURE,
+        max_tokens=settings.LLM_MAX_TOKENS,
+        google_api_key=settings.GOOGLE_API_KEY,
+        cached_content=cache.name,
+        **_transport_kwargs()
+    )
+
+
+def _delete_context_cache(name: str) -> None:
+    """Delete a server-side context cache; one that already expired is ignored"""
+    try:
+        from google.generativeai import caching
+
+        caching.CachedContent.get(name).delete()
+        logger.info("Deleted context cache %s", name)
+    except Exception as e:
+        logger.info("Context cache %s not deleted: %s", name, e)
+
+
+def refresh_cached_llm(
+    system_prompt: str,
+    schema: Optional[Type[BaseModel]] = None,
+    stale_cache: Optional[str] = None
+) -> Optional[ChatGoogleGenerativeAI]:
+    """
+    Recreate a context-cached chat model, e.g. after the server-side cache expired
+
+    The lru_cache can't evict a single entry, so every memoized model is
+    dropped; the others are recreated on their next get_cached_llm call.
+
+    Args:
+        system_prompt: Static system instruction to cache
+        schema: Optional output schema, as for get_cached_llm
+        stale_cache: Name of the cache being replaced; deleted first so
+            replacements don't accumulate until their TTL runs out
+
+    Returns:
+        Fresh ChatGoogleGenerativeAI, or None if the cache can't be created
+    """
+    if stale_cache:
+        _delete_context_cache(stale_cache)
+    get_cached_llm.cache_clear()
+    return get_cached_llm(system_prompt, schema)
@@ -0,0 +1,156 @@
+"""
+Shared helpers for agents
+"""
+import asyncio
+import inspect
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import orjson
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.tools import BaseTool
+from tools import TOOL_IMPLEMENTATIONS
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Attraction fields the LLM needs to reason about a search result
+_ATTRACTION_FIELDS = ("name", "rating", "coordinates")
+
+
+def summarize_dict(data: Any, max_chars: int) -> str:
+    """
+    Serialize data to compact JSON, truncated to at most max_chars
+
+    Uses orjson, which is several times faster than the stdlib encoder and
+    emits no whitespace between tokens.
+
+    Args:
+        data: JSON-serializable object (usually a dict of tool results)
+        max_chars: Maximum length of the returned string
+
+    Returns:
+        JSON text, truncated to max_chars
+    """
+    encoded = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return encoded.decode()[:max_chars]
+
+
+def compact_tool_result(result: Any, max_chars: int) -> str:
+    """
+    Render a tool result compactly for the LLM conversation
+
+    Attraction lists are reduced to names, ratings and coordinates; the full
+    payload stays in the agent's results dict for later phases.
+
+    Args:
+        result: Tool return value
+        max_chars: Maximum length of the returned string
+
+    Returns:
+        Compact JSON text, truncated to max_chars
+    """
+    if isinstance(result, dict) and "attractions" in result:
+        result = {
+            **result,
+            "attractions": [
+                {field: attraction[field] for field in _ATTRACTION_FIELDS if field in attraction}
+                for attraction in result["attractions"]
+            ]
+        }
+    return summarize_dict(result, max_chars)
+
+
+def is_final_answer(message: BaseMessage) -> bool:
+    """
+    Check whether an agent message is a finished answer
+
+    Args:
+        message: Last message in the agent conversation
+
+    Returns:
+        True if it is an AI reply with text content and no pending tool calls
+    """
+    return (
+        isinstance(message, AIMessage)
+        and not message.tool_calls
+        and isinstance(message.content, str)
+        and bool(message.content.strip())
+    )
+
+
+def message_text(message: BaseMessage, max_chars: int) -> str:
+    """
+    Extract a message's text content for storing in workflow state
+
+    Agents keep only this summary text; full message objects would be
+    carried through every later state update unread.
+
+    Args:
+        message: Chat message, usually an agent's final reply
+        max_chars: Maximum length of the returned string
+
+    Returns:
+        Text content, truncated to max_chars (empty for non-text content)
+    """
+    content = message.content if isinstance(message.content, str) else ""
+    return content[:max_chars]
+
+
+def tool_call_signature(message: AIMessage) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Summarize the tool calls in an agent reply for repeat detection
+
+    Agents stop once a reply repeats their previous tool calls verbatim.
+
+    Args:
+        message: AI reply from a tool-bound model
+
+    Returns:
+        List of (tool name, args) pairs, empty if no tools were called
+    """
+    return [(tc['name'], tc['args']) for tc in message.tool_calls]
+
+
+async def run_tool_call(
+    tool_call: Dict[str, Any],
+    tool_map: Dict[str, BaseTool],
+    tool_cache: Dict[tuple, asyncio.Task],
+    extra_kwargs: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None
+) -> Any:
+    """
+    Execute a single tool call requested by the LLM
+
+    The LLM's arguments are validated (and coerced) against the tool schema,
+    then the implementation is called directly, skipping tool callbacks.
+    Sync implementations run in a worker thread. Identical calls within one
+    run share a single invocation.
+
+    Args:
+        tool_call: Tool call emitted by the LLM
+        tool_map: Tools the agent bound, by name
+        tool_cache: Per-run map of (tool name, args) to tool invocations
+        extra_kwargs: Optional hook returning extra keyword arguments for the
+            implementation from the tool name and validated arguments
+
+    Returns:
+        Tool result
+    """
+    tool_name = tool_call['name']
+    tool_args = tool_call['args']
+    key = (tool_name, json.dumps(tool_args, sort_keys=True, default=str))
+
+    task = tool_cache.get(key)
+    if task is None:
+        logger.debug("Calling tool: %s with args: %s", tool_name, tool_args)
+        args = dict(tool_map[tool_name].args_schema.model_validate(tool_args))
+        if extra_kwargs is not None:
+            args.update(extra_kwargs(tool_name, args))
+        impl = TOOL_IMPLEMENTATIONS[tool_name]
+        if inspect.iscoroutinefunction(impl):
+            task = asyncio.ensure_future(impl(**args))
+        else:
+            task = asyncio.ensure_future(asyncio.to_thread(impl, **args))
+        tool_cache[key] = task
+    else:
+        logger.debug("Reusing result of tool: %s with args: %s", tool_name, tool_args)
+    return await task
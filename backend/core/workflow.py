@@ -1,14 +1,30 @@
 """
 LangGraph workflow orchestration for trip planning
 """
-from typing import TypedDict, Annotated, List, Dict, Any
-from operator import add
-from langgraph.graph import StateGraph, END
+import asyncio
+import copy
+import hashlib
+import json
+from functools import cached_property
+from typing import TypedDict, Annotated, List, Dict, Any, AsyncIterator, Optional, Union
+from operator import add, or_
+from cachetools import TTLCache
+from langgraph.graph import StateGraph, START, END
 from agents import ResearcherAgent, BudgetAgent, PlannerAgent
+from core.config import get_settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+AGENT_NODES = ("researcher", "budget", "planner")
+
+
+def _join_errors(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    """Reducer keeping error messages from every agent that failed"""
+    if current and new:
+        return f"{current}; {new}"
+    return current or new
+
 
 class TripPlannerState(TypedDict):
     """State shared across all agents"""
@@ -18,23 +34,38 @@ class TripPlannerState(TypedDict):
     num_days: int
     travel_style: str
     interests: List[str]
-    messages: Annotated[List, add]
-    research_data: Dict[str, Any]
-    budget_analysis: Dict[str, Any]
+    messages: Annotated[List[str], add]  # Agent summary texts
+    research_data: Annotated[Dict[str, Any], or_]
+    budget_analysis: Annotated[Dict[str, Any], or_]
     itinerary: Dict[str, Any]
     next_agent: str
+    error: Annotated[Optional[str], _join_errors]
 
 
 class TripPlannerWorkflow:
     """LangGraph workflow for multi-agent trip planning"""
     
     def __init__(self):
-        self.researcher = ResearcherAgent()
-        self.budget_agent = BudgetAgent()
-        self.planner = PlannerAgent()
+        # Agents (and the LLM client) are created on first use, see below
         self.app = self._build_workflow()
+        # Identical requests share one in-flight run and reuse recent results
+        self._inflight: Dict[str, asyncio.Task] = {}
+        settings = get_settings()
+        self._result_cache = TTLCache(maxsize=settings.RESULT_CACHE_SIZE, ttl=settings.RESULT_CACHE_TTL)
         logger.info("Workflow initialized")
     
+    @cached_property
+    def researcher(self) -> ResearcherAgent:
+        return ResearcherAgent()
+    
+    @cached_property
+    def budget_agent(self) -> BudgetAgent:
+        return BudgetAgent()
+    
+    @cached_property
+    def planner(self) -> PlannerAgent:
+        return PlannerAgent()
+    
     def _build_workflow(self):
         """Build the LangGraph workflow"""
         workflow = StateGraph(TripPlannerState)
@@ -44,9 +75,11 @@ class TripPlannerWorkflow:
         workflow.add_node("budget", self._budget_node)
         workflow.add_node("planner", self._planner_node)
         
-        # Define the flow
-        workflow.set_entry_point("researcher")
-        workflow.add_edge("researcher", "budget")
+        # Define the flow: researcher and budget fan out in parallel
+        # and join at the planner
+        workflow.add_edge(START, "researcher")
+        workflow.add_edge(START, "budget")
+        workflow.add_edge("researcher", "planner")
         workflow.add_edge("budget", "planner")
         workflow.add_edge("planner", END)
         
@@ -55,41 +88,27 @@ class TripPlannerWorkflow:
         logger.info("Workflow compiled successfully")
         return app
     
-    def _researcher_node(self, state: TripPlannerState) -> TripPlannerState:
+    # Nodes return only the keys they update; LangGraph merges the partial
+    # result into the state using the reducers declared on TripPlannerState
+    
+    async def _researcher_node(self, state: TripPlannerState) -> Dict[str, Any]:
         """Researcher agent node"""
         logger.info("Executing researcher node")
-        result = self.researcher.execute(state)
-        # Merge result with existing state
-        return {**state, **result}
+        return await self.researcher.aexecute(state)
     
-    def _budget_node(self, state: TripPlannerState) -> TripPlannerState:
+    async def _budget_node(self, state: TripPlannerState) -> Dict[str, Any]:
         """Budget agent node"""
         logger.info("Executing budget node")
-        result = self.budget_agent.execute(state)
-        # Merge result with existing state
-        return {**state, **result}
+        return await self.budget_agent.aexecute(state)
     
-    def _planner_node(self, state: TripPlannerState) -> TripPlannerState:
+    async def _planner_node(self, state: TripPlannerState) -> Dict[str, Any]:
         """Planner agent node"""
         logger.info("Executing planner node")
-        result = self.planner.execute(state)
-        # Merge result with existing state
-        return {**state, **result}
+        return await self.planner.aexecute(state)
     
-    def execute(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Execute the complete workflow
-        
-        Args:
-            request: Trip planning request
-        
-        Returns:
-            Final state with itinerary
-        """
-        logger.info(f"Starting workflow for {request['destination']}")
-        
-        # Initialize state
-        initial_state = {
+    def _initial_state(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the initial graph state from a trip planning request"""
+        return {
             "user_request": f"Plan trip to {request['destination']}",
             "destination": request["destination"],
             "budget_usd": request["budget_usd"],
@@ -102,12 +121,103 @@ class TripPlannerWorkflow:
             "itinerary": {},
             "next_agent": "researcher"
         }
+    
+    @staticmethod
+    def _request_key(request: Dict[str, Any]) -> str:
+        """Stable cache key for a trip planning request"""
+        payload = json.dumps(request, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    async def _run(self, key: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the graph once and cache successful results"""
+        result = await self.app.ainvoke(self._initial_state(request))
+        # Runs where any agent failed (including a placeholder itinerary)
+        # are not cached, so a transient API error isn't served for the TTL
+        if result.get("itinerary") and not result.get("error"):
+            self._result_cache[key] = result
+        return result
+    
+    async def aexecute(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute the complete workflow
+        
+        Concurrent identical requests are coalesced into a single run, and
+        error-free results are reused until RESULT_CACHE_TTL expires.
+        
+        Args:
+            request: Trip planning request
+        
+        Returns:
+            Final state with itinerary
+        """
+        key = self._request_key(request)
+        
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            logger.info("Serving cached result for %s", request['destination'])
+            return copy.deepcopy(cached)
+        
+        task = self._inflight.get(key)
+        if task is None:
+            logger.info("Starting workflow for %s", request['destination'])
+            task = asyncio.create_task(self._run(key, request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("Joining in-flight workflow for %s", request['destination'])
         
         try:
-            # Execute workflow
-            result = self.app.invoke(initial_state)
+            # Shield so one disconnected client doesn't cancel the shared run
+            result = await asyncio.shield(task)
             logger.info("Workflow completed successfully")
-            return result
+            return copy.deepcopy(result)
         except Exception as e:
-            logger.error(f"Workflow execution error: {e}")
+            logger.error("Workflow execution error: %s", e)
             raise
+    
+    async def abatch(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrency: int
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Execute the workflow for several requests concurrently
+        
+        Args:
+            requests: Trip planning requests
+            max_concurrency: Maximum number of workflows running at once
+        
+        Returns:
+            Final state (or the raised exception) for each request, in input order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(request: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aexecute(request)
+        
+        logger.info("Starting batch of %s workflows", len(requests))
+        return await asyncio.gather(*(run_one(r) for r in requests), return_exceptions=True)
+    
+    async def astream_events(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the workflow, yielding agent progress as it happens
+        
+        Args:
+            request: Trip planning request
+        
+        Yields:
+            LangGraph v2 events for agent node start/end and LLM token deltas
+        """
+        logger.info("Starting streaming workflow for %s", request['destination'])
+        
+        async for event in self.app.astream_events(self._initial_state(request), version="v2"):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+            
+            if kind in ("on_chain_start", "on_chain_end"):
+                # Only the agent nodes themselves, not their inner runnables
+                if event["name"] in AGENT_NODES and node == event["name"]:
+                    yield event
+            elif kind == "on_chat_model_stream" and node in AGENT_NODES:
+                yield event
@@ -1,14 +1,23 @@
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import anyio.to_thread
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
 from models.schemas import TripRequest, TripResponse
 from core.workflow import TripPlannerWorkflow
-from core.config import settings
+from core.config import get_settings
+from tools import close_http_client
 import logging
 import uuid
 import json
 from datetime import datetime
+from typing import Any, Dict, List, Union
+
+settings = get_settings()
 
 # Configure logging
 logging.basicConfig(
@@ -17,11 +26,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up thread pools and the workflow on startup, release clients on shutdown"""
+    # Sync tools (geocoding, OpenTripMap) are offloaded to the loop's default
+    # executor by ainvoke; size it for concurrent requests and parallel calls
+    executor = ThreadPoolExecutor(
+        max_workers=settings.WORKER_THREADS,
+        thread_name_prefix="tool"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.WORKER_THREADS
+    
+    # Agents and the LLM client are built lazily on the first plan request
+    app.state.workflow = TripPlannerWorkflow()
+    yield
+    await close_http_client()
+    executor.shutdown(wait=False)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Trip Planner API",
     description="Multi-agent trip planning system with live data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -33,8 +64,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize workflow
-workflow = TripPlannerWorkflow()
+
+def get_workflow(request: Request) -> TripPlannerWorkflow:
+    """Dependency returning the app-wide workflow"""
+    return request.app.state.workflow
+
+
+# Responses are validated once when built, then serialized here directly;
+# returning a Response stops FastAPI from validating them a second time
+# against response_model and running them through jsonable_encoder
+_TRIP_RESPONSE_LIST = TypeAdapter(List[TripResponse])
+
+
+def _json_response(content: Union[str, bytes]) -> Response:
+    """Wrap already-serialized JSON in a response"""
+    return Response(content=content, media_type="application/json")
+
+
+def _to_request_dict(request: TripRequest) -> Dict[str, Any]:
+    """Convert a validated trip request into the workflow's input dict"""
+    return {
+        "destination": request.destination,
+        "budget_usd": request.budget_usd,
+        "num_days": request.num_days,
+        "travel_style": request.travel_style.value,
+        "interests": request.interests
+    }
 
 
 @app.get("/")
@@ -57,7 +112,7 @@ async def health_check():
 
 
 @app.post("/plan", response_model=TripResponse)
-async def plan_trip(request: TripRequest):
+async def plan_trip(request: TripRequest, workflow: TripPlannerWorkflow = Depends(get_workflow)):
     """
     Plan a trip based on user preferences
     
@@ -68,45 +123,92 @@ async def plan_trip(request: TripRequest):
         Complete trip itinerary with day-by-day plans
     """
     request_id = f"trip_{uuid.uuid4().hex[:8]}"
-    logger.info(f"Received trip planning request {request_id} for {request.destination}")
+    logger.info("Received trip planning request %s for %s", request_id, request.destination)
     
     try:
         # Convert request to dict
-        request_dict = {
-            "destination": request.destination,
-            "budget_usd": request.budget_usd,
-            "num_days": request.num_days,
-            "travel_style": request.travel_style.value,
-            "interests": request.interests
-        }
+        request_dict = _to_request_dict(request)
         
         # Execute workflow
-        logger.info(f"Executing workflow for request {request_id}")
-        result = workflow.execute(request_dict)
+        logger.info("Executing workflow for request %s", request_id)
+        result = await workflow.aexecute(request_dict)
         
-        logger.info(f"Workflow result keys: {list(result.keys())}")
-        logger.info(f"Itinerary type: {type(result.get('itinerary'))}")
-        logger.info(f"Itinerary value: {result.get('itinerary')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Workflow result keys: %s", list(result.keys()))
+            logger.debug("Itinerary value: %s", result.get('itinerary'))
         
         # Build response
+        # A failed planner leaves an empty itinerary; report its error instead
         response = TripResponse(
             request_id=request_id,
             status="completed",
-            itinerary=result.get("itinerary"),
+            itinerary=result.get("itinerary") or None,
             agent_updates=[],
             error=result.get("error")
         )
         
-        logger.info(f"Request {request_id} completed successfully")
-        return response
+        logger.info("Request %s completed successfully", request_id)
+        return _json_response(response.model_dump_json())
         
     except Exception as e:
-        logger.error(f"Error processing request {request_id}: {e}")
+        logger.error("Error processing request %s: %s", request_id, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/plan/batch", response_model=List[TripResponse])
+async def plan_trip_batch(
+    requests: List[TripRequest],
+    workflow: TripPlannerWorkflow = Depends(get_workflow)
+):
+    """
+    Plan several trips concurrently
+    
+    Args:
+        requests: Trip planning requests
+    
+    Returns:
+        One response per request, in input order
+    """
+    if len(requests) > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch size {len(requests)} exceeds limit of {settings.BATCH_MAX_SIZE}"
+        )
+    
+    request_ids = [f"trip_{uuid.uuid4().hex[:8]}" for _ in requests]
+    logger.info("Received batch of %s trip planning requests", len(requests))
+    
+    results = await workflow.abatch(
+        [_to_request_dict(r) for r in requests],
+        max_concurrency=settings.BATCH_MAX_CONCURRENCY
+    )
+    
+    responses = []
+    for request_id, result in zip(request_ids, results):
+        if isinstance(result, Exception):
+            logger.error("Error processing request %s: %s", request_id, result)
+            responses.append(TripResponse(request_id=request_id, status="failed", error=str(result)))
+            continue
+        
+        try:
+            responses.append(TripResponse(
+                request_id=request_id,
+                status="completed",
+                itinerary=result.get("itinerary") or None,
+                agent_updates=[],
+                error=result.get("error")
+            ))
+        except Exception as e:
+            # e.g. an itinerary that fails validation; only this item fails
+            logger.error("Invalid result for request %s: %s", request_id, e)
+            responses.append(TripResponse(request_id=request_id, status="failed", error=str(e)))
+    
+    logger.info("Batch of %s requests completed", len(requests))
+    return _json_response(_TRIP_RESPONSE_LIST.dump_json(responses))
+
+
 @app.post("/plan/stream")
-async def plan_trip_stream(request: TripRequest):
+async def plan_trip_stream(request: TripRequest, workflow: TripPlannerWorkflow = Depends(get_workflow)):
     """
     Plan a trip with streaming updates
     
@@ -117,30 +219,43 @@ async def plan_trip_stream(request: TripRequest):
         Server-sent events stream with agent progress
     """
     request_id = f"trip_{uuid.uuid4().hex[:8]}"
-    logger.info(f"Received streaming request {request_id} for {request.destination}")
+    logger.info("Received streaming request %s for %s", request_id, request.destination)
     
     async def event_generator():
         try:
             # Send initial status
-            yield f"data: {json.dumps({'status': 'started', 'agent': 'researcher'})}\n\n"
+            yield f"data: {json.dumps({'status': 'started', 'request_id': request_id})}\n\n"
             
             # Convert request to dict
-            request_dict = {
-                "destination": request.destination,
-                "budget_usd": request.budget_usd,
-                "num_days": request.num_days,
-                "travel_style": request.travel_style.value,
-                "interests": request.interests
-            }
+            request_dict = _to_request_dict(request)
             
-            # Execute workflow (in production, you'd want to stream intermediate results)
-            result = workflow.execute(request_dict)
+            # Forward agent progress and token deltas as they happen
+            itinerary = None
+            async for event in workflow.astream_events(request_dict):
+                kind = event["event"]
+                payload = {"event": kind, "name": event["name"]}
+                
+                if kind == "on_chain_start":
+                    payload["status"] = "running"
+                elif kind == "on_chain_end":
+                    payload["status"] = "done"
+                    if event["name"] == "planner":
+                        itinerary = (event["data"].get("output") or {}).get("itinerary")
+                else:
+                    # on_chat_model_stream: attribute the delta to its agent
+                    chunk = event["data"]["chunk"]
+                    payload["name"] = event["metadata"]["langgraph_node"]
+                    payload["data"] = chunk.content if isinstance(chunk.content, str) else ""
+                    if not payload["data"]:
+                        continue
+                
+                yield f"data: {json.dumps(payload)}\n\n"
             
             # Send completion
-            yield f"data: {json.dumps({'status': 'completed', 'itinerary': result.get('itinerary')})}\n\n"
+            yield f"data: {json.dumps({'status': 'completed', 'itinerary': itinerary})}\n\n"
             
         except Exception as e:
-            logger.error(f"Error in streaming request {request_id}: {e}")
+            logger.error("Error in streaming request %s: %s", request_id, e)
             yield f"data: {json.dumps({'status': 'error', 'message': str(e)})}\n\n"
     
     return StreamingResponse(event_generator(), media_type="text/event-stream")
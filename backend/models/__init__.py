@@ -1,3 +1,3 @@
-from .schemas import TripRequest, TripResponse, AgentStatus, Itinerary, DayPlan
+from .schemas import TripRequest, TripResponse, AgentStatus, Itinerary, ItineraryDraft, DayPlan
 
-__all__ = ["TripRequest", "TripResponse", "AgentStatus", "Itinerary", "DayPlan"]
+__all__ = ["TripRequest", "TripResponse", "AgentStatus", "Itinerary", "ItineraryDraft", "DayPlan"]
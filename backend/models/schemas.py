@@ -1,12 +1,36 @@
 """
 Pydantic models for request/response validation
 """
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+from typing import Annotated, List, Literal, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 
 
+# OpenAPI examples, shared by the models' JSON schemas
+_TRIP_REQUEST_EXAMPLE = {
+    "destination": "Paris",
+    "num_days": 4,
+    "budget_usd": 2500,
+    "travel_style": "mid-range",
+    "interests": ["museums", "landmarks", "food"]
+}
+
+_TRIP_RESPONSE_EXAMPLE = {
+    "request_id": "trip_123456",
+    "status": "completed",
+    "itinerary": {
+        "destination": "Paris",
+        "num_days": 4,
+        "total_budget": 2500,
+        "travel_style": "mid-range",
+        "day_plans": [],
+        "total_cost": 2400,
+        "budget_status": "within_budget"
+    }
+}
+
+
 class TravelStyle(str, Enum):
     BUDGET = "budget"
     MID_RANGE = "mid-range"
@@ -19,39 +43,26 @@ class AgentType(str, Enum):
     PLANNER = "planner"
 
 
+def _normalize_interests(v: List[str]) -> List[str]:
+    """Lowercase, trim and de-duplicate interests, keeping their order"""
+    return list(dict.fromkeys(map(str.strip, map(str.lower, v))))
+
+
 class TripRequest(BaseModel):
     """User trip planning request"""
     destination: str = Field(..., description="Destination city", min_length=2)
     num_days: int = Field(..., description="Number of days", ge=1, le=30)
     budget_usd: float = Field(..., description="Budget in USD", ge=100)
     travel_style: TravelStyle = Field(..., description="Travel style preference")
-    interests: List[str] = Field(..., description="User interests", min_items=1)
+    interests: Annotated[List[str], AfterValidator(_normalize_interests)] = Field(
+        ..., description="User interests", min_length=1
+    )
     
-    @validator('interests')
-    def validate_interests(cls, v):
-        if not v:
-            raise ValueError("At least one interest is required")
-        return [interest.lower().strip() for interest in v]
-    
-    class Config:
-        schema_extra = {
-            "example": {
-                "destination": "Paris",
-                "num_days": 4,
-                "budget_usd": 2500,
-                "travel_style": "mid-range",
-                "interests": ["museums", "landmarks", "food"]
-            }
-        }
-
-
-class AgentStatus(BaseModel):
-    """Agent execution status"""
-    agent: AgentType
-    status: str
-    message: str
-    timestamp: datetime = Field(default_factory=datetime.now)
-    data: Optional[Dict[str, Any]] = None
+    model_config = ConfigDict(
+        # Unknown fields are rejected up front instead of being carried along
+        extra="forbid",
+        json_schema_extra={"example": _TRIP_REQUEST_EXAMPLE}
+    )
 
 
 class Activity(BaseModel):
@@ -73,6 +84,14 @@ class DayPlan(BaseModel):
     summary: str
 
 
+class ItineraryDraft(BaseModel):
+    """Day-by-day itinerary with costs, budget status and travel tips"""
+    day_plans: List[DayPlan] = Field(..., description="One plan per trip day")
+    total_cost: float = Field(..., description="Total trip cost in USD")
+    budget_status: str = Field(..., description='"within_budget" or "over_budget"')
+    recommendations: List[str] = Field(default=[], description="Practical travel tips")
+
+
 class Itinerary(BaseModel):
     """Complete trip itinerary"""
     destination: str
@@ -86,6 +105,37 @@ class Itinerary(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+class ResearcherData(BaseModel):
+    """Researcher agent output"""
+    agent: Literal["researcher"] = "researcher"
+    research_data: Dict[str, Dict[str, Any]] = {}
+
+
+class BudgetData(BaseModel):
+    """Budget agent output"""
+    agent: Literal["budget"] = "budget"
+    budget_analysis: Dict[str, Dict[str, Any]] = {}
+
+
+class PlannerData(BaseModel):
+    """Planner agent output"""
+    agent: Literal["planner"] = "planner"
+    itinerary: Optional[Itinerary] = None
+
+
+# Tagged by "agent" so validation dispatches straight to the matching model
+AgentData = Annotated[Union[ResearcherData, BudgetData, PlannerData], Field(discriminator="agent")]
+
+
+class AgentStatus(BaseModel):
+    """Agent execution status"""
+    agent: AgentType
+    status: str
+    message: str
+    timestamp: datetime = Field(default_factory=datetime.now)
+    data: Optional[AgentData] = None
+
+
 class TripResponse(BaseModel):
     """API response for trip planning"""
     request_id: str
@@ -94,19 +144,4 @@ class TripResponse(BaseModel):
     agent_updates: List[AgentStatus] = []
     error: Optional[str] = None
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "request_id": "trip_123456",
-                "status": "completed",
-                "itinerary": {
-                    "destination": "Paris",
-                    "num_days": 4,
-                    "total_budget": 2500,
-                    "travel_style": "mid-range",
-                    "day_plans": [],
-                    "total_cost": 2400,
-                    "budget_status": "within_budget"
-                }
-            }
-        }
+    model_config = ConfigDict(json_schema_extra={"example": _TRIP_RESPONSE_EXAMPLE})
@@ -1,5 +1,16 @@
-from .search_tools import search_attractions
-from .cost_tools import estimate_costs
-from .distance_tools import calculate_distance
+from .search_tools import search_attractions, close_http_client, _search_attractions_impl
+from .cost_tools import estimate_costs, _estimate_costs_impl
+from .distance_tools import calculate_distance, _calculate_distance_impl
+from ._geo import GeoContext
 
-__all__ = ["search_attractions", "estimate_costs", "calculate_distance"]
+# Plain implementations by tool name, for callers that validate arguments
+# themselves and don't need LangChain's callbacks and tracing; some are
+# coroutine functions
+TOOL_IMPLEMENTATIONS = {
+    "search_attractions": _search_attractions_impl,
+    "estimate_costs": _estimate_costs_impl,
+    "calculate_distance": _calculate_distance_impl
+}
+
+__all__ = ["search_attractions", "estimate_costs", "calculate_distance", "close_http_client", "GeoContext",
+           "TOOL_IMPLEMENTATIONS"]
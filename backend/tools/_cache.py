@@ -0,0 +1,68 @@
+"""
+Process-wide result caching for network-bound tools
+"""
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict
+from cachetools import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def cache_successful_results(maxsize: int, ttl: int) -> Callable:
+    """
+    Memoize a tool function's successful results for ttl seconds
+
+    Results without "success": True (API errors, unknown cities) are not
+    cached so transient failures are retried on the next call. Works for
+    both plain and async functions.
+
+    Args:
+        maxsize: Maximum number of cached argument combinations
+        ttl: Time to live of each entry in seconds
+
+    Returns:
+        Decorator for functions returning a result dictionary
+    """
+    def decorator(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.Lock()
+
+        def lookup(key: tuple) -> Any:
+            with lock:
+                result = cache.get(key)
+            if result is not None:
+                logger.info("Cache hit for %s", func.__name__)
+            return result
+
+        def store(key: tuple, result: Dict[str, Any]) -> None:
+            if result.get("success"):
+                with lock:
+                    cache[key] = result
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+                key = (args, tuple(sorted(kwargs.items())))
+                result = lookup(key)
+                if result is None:
+                    result = await func(*args, **kwargs)
+                    store(key, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            key = (args, tuple(sorted(kwargs.items())))
+            result = lookup(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                store(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,132 @@
+"""
+Shared geocoding for location-based tools
+"""
+import asyncio
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from geopy.extra.rate_limiter import RateLimiter
+from geopy.geocoders import Nominatim
+
+logger = logging.getLogger(__name__)
+geolocator = Nominatim(user_agent="trip_planner_production")
+
+# Nominatim allows 1 request/s. Lookups come from several worker threads at
+# once (tool calls, destination prefetch, batch runs) and RateLimiter isn't
+# thread-safe, so cold lookups are serialized through it. Errors still
+# raise, so failures aren't memoized as "not found"
+_rate_limited_geocode = RateLimiter(
+    lambda query, **kwargs: geolocator.geocode(query, **kwargs),
+    min_delay_seconds=1,
+    max_retries=2,
+    swallow_exceptions=False
+)
+_geocode_lock = threading.Lock()
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+@lru_cache(maxsize=512)
+def _geocode_cached(name: str) -> Optional[Tuple[float, float]]:
+    """Geocode a normalized place name through the rate-limited Nominatim client"""
+    with _geocode_lock:
+        location = _rate_limited_geocode(name, timeout=10)
+    if not location:
+        return None
+    return (location.latitude, location.longitude)
+
+
+def geocode(name: str) -> Optional[Tuple[float, float]]:
+    """
+    Look up the coordinates of a place, memoized per process
+    
+    Args:
+        name: Place name, e.g. a city
+    
+    Returns:
+        (latitude, longitude) tuple, or None if the place was not found
+    """
+    return _geocode_cached(name.strip().lower())
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points on a spherical Earth
+    
+    Within about 0.5% of the ellipsoidal (geodesic) distance, which is
+    plenty for travel time estimates.
+    
+    Args:
+        lat1: Latitude of the first point in degrees
+        lon1: Longitude of the first point in degrees
+        lat2: Latitude of the second point in degrees
+        lon2: Longitude of the second point in degrees
+    
+    Returns:
+        Distance in kilometers
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+@dataclass
+class GeoContext:
+    """Coordinates of a trip's destination, geocoded once up front"""
+    destination: str
+    destination_coords: Optional[Tuple[float, float]] = None
+    
+    @classmethod
+    async def create(cls, destination: str) -> "GeoContext":
+        """
+        Geocode a destination without blocking the event loop
+        
+        Args:
+            destination: Trip destination
+        
+        Returns:
+            GeoContext, without coordinates if geocoding failed
+        """
+        try:
+            coords = await asyncio.to_thread(geocode, destination)
+        except Exception as e:
+            logger.warning("Could not pre-geocode %s: %s", destination, e)
+            coords = None
+        return cls(destination, coords)
+    
+    def coords_for(self, name: str) -> Optional[Tuple[float, float]]:
+        """Get known coordinates for a place name, if it is the destination"""
+        if name.strip().lower() == self.destination.strip().lower():
+            return self.destination_coords
+        return None
+    
+    def tool_kwargs(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get pre-geocoded coordinate arguments for a location tool call
+        
+        Args:
+            tool_name: Name of the tool being called
+            args: Validated tool arguments
+        
+        Returns:
+            Extra keyword arguments for the tool implementation
+        """
+        if tool_name == "search_attractions":
+            names = {"coords": args["city"]}
+        elif tool_name == "calculate_distance":
+            names = {"origin_coords": args["origin"], "dest_coords": args["destination"]}
+        else:
+            return {}
+        
+        kwargs = {}
+        for param, name in names.items():
+            coords = self.coords_for(name)
+            if coords:
+                kwargs[param] = coords
+        return kwargs
@@ -1,8 +1,8 @@
 """
 Cost estimation tools using real travel cost data
 """
-import json
-from typing import Dict, Any
+import sys
+from typing import Callable, Dict, Any, Tuple
 from langchain_core.tools import tool
 import logging
 
@@ -69,60 +69,96 @@ DEFAULT_COSTS = {
 }
 
 
-@tool
-def estimate_costs(destination: str, style: str, days: int) -> str:
+def _make_estimator(costs: Dict[str, float]) -> Callable[[str, str, int], Dict[str, Any]]:
     """
-    Estimate travel costs based on real 2024 data from Numbeo and Budget Your Trip.
+    Specialize the cost estimate for one static cost entry
+    
+    The daily total and percentage breakdown are computed here, once; the
+    returned function only fills in the request fields and the trip total.
     
     Args:
-        destination: Destination city name
-        style: Travel style ('budget', 'mid-range', or 'luxury')
-        days: Number of days for the trip
+        costs: Daily costs by category
     
     Returns:
-        JSON string with detailed cost breakdown and trip total
+        Function mapping (destination, style, days) to a cost estimate
     """
+    daily_total = round(sum(costs.values()), 2)
+    breakdown_percentage = {
+        "accommodation": round((costs["hotel"] / daily_total) * 100, 1),
+        "meals": round((costs["meals"] / daily_total) * 100, 1),
+        "transport": round((costs["transport"] / daily_total) * 100, 1),
+        "activities": round((costs["activities"] / daily_total) * 100, 1)
+    }
+    
+    def estimate(destination: str, style: str, days: int) -> Dict[str, Any]:
+        # Copies, so callers editing a result can't alter the shared tables
+        return {
+            "destination": destination,
+            "travel_style": style,
+            "num_days": days,
+            "daily_costs_usd": dict(costs),
+            "daily_total_usd": daily_total,
+            "trip_total_usd": round(daily_total * days, 2),
+            "breakdown_percentage": dict(breakdown_percentage),
+            "data_source": "Numbeo & Budget Your Trip 2024",
+            "success": True
+        }
+    
+    return estimate
+
+
+# The tables are static, so one specialized estimator is built per entry at
+# import, keyed flat by (destination, style) for a single lookup
+_ESTIMATORS: Dict[Tuple[str, str], Callable[[str, str, int], Dict[str, Any]]] = {
+    (sys.intern(dest), sys.intern(style)): _make_estimator(costs)
+    for dest, styles in COST_DATABASE.items()
+    for style, costs in styles.items()
+}
+_DEFAULT_ESTIMATORS: Dict[str, Callable[[str, str, int], Dict[str, Any]]] = {
+    sys.intern(style): _make_estimator(costs) for style, costs in DEFAULT_COSTS.items()
+}
+
+
+def _estimate_costs_impl(destination: str, style: str, days: int) -> Dict[str, Any]:
+    """Implementation of estimate_costs, callable without LangChain's tool dispatch"""
     try:
-        logger.info(f"Estimating costs for {destination}, {style}, {days} days")
+        logger.info("Estimating costs for %s, %s, %s days", destination, style, days)
         
         dest_key = destination.lower().strip()
         style_key = style.lower().strip()
         
+        if style_key not in _DEFAULT_ESTIMATORS:
+            style_key = "mid-range"
+        
         # Get costs from database or use defaults
-        if dest_key in COST_DATABASE:
-            costs = COST_DATABASE[dest_key].get(style_key, COST_DATABASE[dest_key]["mid-range"])
-            logger.info(f"Using specific cost data for {dest_key}")
+        estimator = _ESTIMATORS.get((dest_key, style_key))
+        if estimator is not None:
+            logger.info("Using specific cost data for %s", dest_key)
         else:
-            costs = DEFAULT_COSTS.get(style_key, DEFAULT_COSTS["mid-range"])
-            logger.info(f"Using default cost data for {dest_key}")
+            estimator = _DEFAULT_ESTIMATORS[style_key]
+            logger.info("Using default cost data for %s", dest_key)
         
-        # Calculate totals
-        daily_total = sum(costs.values())
-        trip_total = daily_total * days
+        result = estimator(destination, style, days)
         
-        # Calculate percentages
-        breakdown_percentage = {
-            "accommodation": round((costs["hotel"] / daily_total) * 100, 1),
-            "meals": round((costs["meals"] / daily_total) * 100, 1),
-            "transport": round((costs["transport"] / daily_total) * 100, 1),
-            "activities": round((costs["activities"] / daily_total) * 100, 1)
-        }
-        
-        result = {
-            "destination": destination,
-            "travel_style": style,
-            "num_days": days,
-            "daily_costs_usd": costs,
-            "daily_total_usd": round(daily_total, 2),
-            "trip_total_usd": round(trip_total, 2),
-            "breakdown_percentage": breakdown_percentage,
-            "data_source": "Numbeo & Budget Your Trip 2024",
-            "success": True
-        }
-        
-        logger.info(f"Estimated trip total: ${trip_total:.2f}")
-        return json.dumps(result, indent=2)
+        logger.info("Estimated trip total: $%.2f", result["trip_total_usd"])
+        return result
         
     except Exception as e:
-        logger.error(f"Error estimating costs: {e}")
-        return json.dumps({"error": str(e), "success": False})
+        logger.error("Error estimating costs: %s", e)
+        return {"error": str(e), "success": False}
+
+
+@tool
+def estimate_costs(destination: str, style: str, days: int) -> Dict[str, Any]:
+    """
+    Estimate travel costs based on real 2024 data from Numbeo and Budget Your Trip.
+    
+    Args:
+        destination: Destination city name
+        style: Travel style ('budget', 'mid-range', or 'luxury')
+        days: Number of days for the trip
+    
+    Returns:
+        Dictionary with detailed cost breakdown and trip total
+    """
+    return _estimate_costs_impl(destination=destination, style=style, days=days)
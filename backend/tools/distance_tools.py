@@ -1,76 +1,83 @@
 """
 Distance and duration calculation tools using GeoPy
 """
-import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from langchain_core.tools import tool
-from geopy.geocoders import Nominatim
-from geopy.distance import geodesic
+from core.config import get_settings
+from tools._cache import cache_successful_results
+from tools._geo import geocode, haversine_km
 import logging
 
 logger = logging.getLogger(__name__)
-geolocator = Nominatim(user_agent="trip_planner_production")
 
 
-@tool
-def calculate_distance(origin: str, destination: str) -> str:
-    """
-    Calculate distance and estimated travel duration between two locations.
-    
-    Args:
-        origin: Starting location name
-        destination: Destination location name
-    
-    Returns:
-        JSON string with distance in km/miles and duration estimates for different transport modes
-    """
+@cache_successful_results(maxsize=get_settings().TOOL_CACHE_SIZE, ttl=get_settings().TOOL_CACHE_TTL)
+def _calculate_distance_impl(
+    origin: str,
+    destination: str,
+    origin_coords: Optional[Tuple[float, float]] = None,
+    dest_coords: Optional[Tuple[float, float]] = None
+) -> Dict[str, Any]:
+    """Implementation of calculate_distance; known coordinates skip geocoding"""
     try:
-        logger.info(f"Calculating distance from {origin} to {destination}")
+        logger.info("Calculating distance from %s to %s", origin, destination)
         
         # Geocode both locations
-        origin_loc = geolocator.geocode(origin, timeout=10)
-        dest_loc = geolocator.geocode(destination, timeout=10)
+        origin_coords = origin_coords or geocode(origin)
+        dest_coords = dest_coords or geocode(destination)
         
-        if not origin_loc or not dest_loc:
+        if not origin_coords or not dest_coords:
             missing = []
-            if not origin_loc:
+            if not origin_coords:
                 missing.append(origin)
-            if not dest_loc:
+            if not dest_coords:
                 missing.append(destination)
-            logger.warning(f"Could not find locations: {missing}")
-            return json.dumps({
+            logger.warning("Could not find locations: %s", missing)
+            return {
                 "error": f"Could not find location(s): {', '.join(missing)}",
                 "success": False
-            })
-        
-        # Calculate geodesic distance
-        origin_coords = (origin_loc.latitude, origin_loc.longitude)
-        dest_coords = (dest_loc.latitude, dest_loc.longitude)
+            }
         
-        distance_km = geodesic(origin_coords, dest_coords).kilometers
+        # Great-circle distance
+        distance_km = haversine_km(*origin_coords, *dest_coords)
         distance_miles = distance_km * 0.621371
         
         # Estimate durations for different transport modes
         # Average speeds: Walking 5 km/h, Cycling 15 km/h, Driving 50 km/h, Public transport 30 km/h
         durations = {
-            "walking_hours": round(distance_km / 5, 2),
-            "cycling_hours": round(distance_km / 15, 2),
-            "driving_hours": round(distance_km / 50, 2),
-            "public_transport_hours": round(distance_km / 30, 2)
+            "walking_hours": distance_km / 5,
+            "cycling_hours": distance_km / 15,
+            "driving_hours": distance_km / 50,
+            "public_transport_hours": distance_km / 30
         }
         
         result = {
             "origin": origin,
             "destination": destination,
-            "distance_km": round(distance_km, 2),
-            "distance_miles": round(distance_miles, 2),
+            "distance_km": distance_km,
+            "distance_miles": distance_miles,
             "estimated_durations": durations,
             "success": True
         }
         
-        logger.info(f"Distance: {distance_km:.2f} km")
-        return json.dumps(result, indent=2)
+        logger.info("Distance: %.2f km", distance_km)
+        return result
         
     except Exception as e:
-        logger.error(f"Error calculating distance: {e}")
-        return json.dumps({"error": str(e), "success": False})
+        logger.error("Error calculating distance: %s", e)
+        return {"error": str(e), "success": False}
+
+
+@tool
+def calculate_distance(origin: str, destination: str) -> Dict[str, Any]:
+    """
+    Calculate distance and estimated travel duration between two locations.
+    
+    Args:
+        origin: Starting location name
+        destination: Destination location name
+    
+    Returns:
+        Dictionary with distance in km/miles and duration estimates for different transport modes
+    """
+    return _calculate_distance_impl(origin=origin, destination=destination)
@@ -1,90 +1,183 @@
 """
 Search tools for finding tourist attractions using OpenTripMap API
 """
-import json
-import requests
-from typing import Dict, Any
+import asyncio
+import threading
+from typing import Dict, Any, Optional, Tuple
+import httpx
+import orjson
+from cachetools import TTLCache
 from langchain_core.tools import tool
-from geopy.geocoders import Nominatim
-from core.config import settings
+from core.config import get_settings
+from tools._cache import cache_successful_results
+from tools._geo import geocode
 import logging
 
 logger = logging.getLogger(__name__)
-geolocator = Nominatim(user_agent="trip_planner_production")
 
+DETAIL_URL = "https://api.opentripmap.com/0.1/en/places/xid/{xid}"
+MAX_CONNECTIONS = 16
 
-@tool
-def search_attractions(city: str, limit: int = 15) -> str:
+# HTTP/2 client shared by all searches, created for the running event loop
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Successful OpenTripMap responses; places rarely change within an hour
+_response_cache = TTLCache(
+    maxsize=get_settings().OPENTRIPMAP_CACHE_SIZE,
+    ttl=get_settings().OPENTRIPMAP_CACHE_TTL
+)
+_response_cache_lock = threading.Lock()
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Get the shared OpenTripMap client, creating it on first use in this loop"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        # Multiplexes concurrent detail requests over one connection; retries
+        # only cover failed connection attempts. Pool settings belong on the
+        # transport: the client ignores http2/limits when given one
+        _client = httpx.AsyncClient(
+            timeout=15,
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+                retries=2
+            )
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared OpenTripMap client (call on application shutdown)"""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+async def _get_json(url: str, params: Dict[str, Any], timeout: float) -> Tuple[int, Any]:
     """
-    Search for real tourist attractions using OpenTripMap API.
+    GET an OpenTripMap endpoint, serving repeated requests from a TTL cache
     
     Args:
-        city: Name of the city to search
-        limit: Maximum number of attractions to return (default: 15)
+        url: Endpoint URL
+        params: Query parameters
+        timeout: Request timeout in seconds
+    
+    Returns:
+        (status code, parsed JSON body or None if the request failed)
+    """
+    key = (url, tuple(sorted(params.items())))
+    with _response_cache_lock:
+        data = _response_cache.get(key)
+    if data is not None:
+        return 200, data
+    
+    response = await _get_client().get(url, params=params, timeout=timeout)
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    data = orjson.loads(response.content)
+    with _response_cache_lock:
+        _response_cache[key] = data
+    return 200, data
+
+
+async def _fetch_detail(xid: str, api_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch one attraction's details from OpenTripMap
+    
+    Args:
+        xid: OpenTripMap object id
+        api_key: OpenTripMap API key
     
     Returns:
-        JSON string with attractions data including names, ratings, and descriptions
+        Attraction dictionary, or None if unnamed or the request failed
     """
     try:
-        logger.info(f"Searching attractions for {city}")
+        status, detail_data = await _get_json(
+            DETAIL_URL.format(xid=xid),
+            params={"apikey": api_key},
+            timeout=10
+        )
+        if status != 200:
+            return None
+        
+        name = detail_data.get("name", "Unknown")
+        if name == "Unknown":
+            return None
+        
+        # Only include fields OpenTripMap actually returned; empty values
+        # would just cost prompt tokens
+        attraction = {"name": name, "rating": detail_data.get("rate", 0)}
+        description = detail_data.get("wikipedia_extracts", {}).get("text")
+        if description:
+            attraction["description"] = description[:200]
+        kinds = [kind for kind in detail_data.get("kinds", "").split(",")[:3] if kind]
+        if kinds:
+            attraction["kinds"] = kinds
+        point = detail_data.get("point") or {}
+        if point.get("lat") is not None and point.get("lon") is not None:
+            attraction["coordinates"] = {"lat": point["lat"], "lon": point["lon"]}
+        return attraction
+    except Exception as e:
+        logger.warning("Error fetching details for %s: %s", xid, e)
+        return None
+
+
+@cache_successful_results(maxsize=get_settings().TOOL_CACHE_SIZE, ttl=get_settings().TOOL_CACHE_TTL)
+async def _search_attractions_impl(
+    city: str,
+    limit: int = 15,
+    coords: Optional[Tuple[float, float]] = None
+) -> Dict[str, Any]:
+    """Implementation of search_attractions; coords skips geocoding the city"""
+    settings = get_settings()
+    
+    try:
+        logger.info("Searching attractions for %s", city)
         
         # Get city coordinates
-        location = geolocator.geocode(city, timeout=10)
-        if not location:
-            logger.warning(f"City not found: {city}")
-            return json.dumps({"error": f"City '{city}' not found", "success": False})
+        if coords is None:
+            coords = await asyncio.to_thread(geocode, city)
+        if not coords:
+            logger.warning("City not found: %s", city)
+            return {"error": f"City '{city}' not found", "success": False}
+        lat, lon = coords
         
-        logger.info(f"Found coordinates for {city}: {location.latitude}, {location.longitude}")
+        logger.info("Found coordinates for %s: %s, %s", city, lat, lon)
         
         # Search for attractions using OpenTripMap
         url = "https://api.opentripmap.com/0.1/en/places/radius"
         params = {
             "radius": settings.SEARCH_RADIUS_KM * 1000,  # Convert to meters
-            "lon": location.longitude,
-            "lat": location.latitude,
+            "lon": lon,
+            "lat": lat,
             "kinds": "museums,theatres,architecture,historic,monuments,cultural,interesting_places",
             "limit": limit,
             "apikey": settings.OPENTRIPMAP_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=15)
+        status, data = await _get_json(url, params=params, timeout=15)
         
-        if response.status_code != 200:
-            logger.error(f"OpenTripMap API error: {response.status_code}")
-            return json.dumps({"error": f"API error: {response.status_code}", "success": False})
+        if status != 200:
+            logger.error("OpenTripMap API error: %s", status)
+            return {"error": f"API error: {status}", "success": False}
         
-        data = response.json()
-        logger.info(f"Found {len(data)} attractions")
+        # Only the first `limit` places are ever used
+        data = data[:limit]
+        logger.info("Found %s attractions", len(data))
         
-        # Get detailed info for top attractions
-        attractions = []
-        for place in data[:limit]:
-            xid = place.get("xid")
-            if xid:
-                try:
-                    detail_url = f"https://api.opentripmap.com/0.1/en/places/xid/{xid}"
-                    detail_params = {"apikey": settings.OPENTRIPMAP_API_KEY}
-                    detail_response = requests.get(detail_url, params=detail_params, timeout=10)
-                    
-                    if detail_response.status_code == 200:
-                        detail_data = detail_response.json()
-                        
-                        name = detail_data.get("name", "Unknown")
-                        if name != "Unknown":
-                            attraction = {
-                                "name": name,
-                                "rating": detail_data.get("rate", 0),
-                                "description": detail_data.get("wikipedia_extracts", {}).get("text", "No description available")[:200],
-                                "kinds": detail_data.get("kinds", "").split(",")[:3],
-                                "coordinates": {
-                                    "lat": detail_data.get("point", {}).get("lat"),
-                                    "lon": detail_data.get("point", {}).get("lon")
-                                }
-                            }
-                            attractions.append(attraction)
-                except Exception as e:
-                    logger.warning(f"Error fetching details for {xid}: {e}")
-                    continue
+        # Fetch details for the top attractions concurrently
+        xids = [place["xid"] for place in data if place.get("xid")]
+        details = await asyncio.gather(
+            *(_fetch_detail(xid, settings.OPENTRIPMAP_API_KEY) for xid in xids)
+        )
+        attractions = [attraction for attraction in details if attraction]
         
         result = {
             "city": city,
@@ -93,9 +186,24 @@ def search_attractions(city: str, limit: int = 15) -> str:
             "success": True
         }
         
-        logger.info(f"Successfully retrieved {len(attractions)} detailed attractions")
-        return json.dumps(result, indent=2)
+        logger.info("Successfully retrieved %s detailed attractions", len(attractions))
+        return result
         
     except Exception as e:
-        logger.error(f"Error searching attractions: {e}")
-        return json.dumps({"error": str(e), "success": False})
+        logger.error("Error searching attractions: %s", e)
+        return {"error": str(e), "success": False}
+
+
+@tool
+async def search_attractions(city: str, limit: int = 15) -> Dict[str, Any]:
+    """
+    Search for real tourist attractions using OpenTripMap API.
+    
+    Args:
+        city: Name of the city to search
+        limit: Maximum number of attractions to return (default: 15)
+    
+    Returns:
+        Dictionary with attractions data including names, ratings, and descriptions
+    """
+    return await _search_attractions_impl(city=city, limit=limit)
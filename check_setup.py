@@ -1,6 +1,7 @@
 """
 Test script to verify the setup is working
 """
+import importlib.util
 import os
 import sys
 
@@ -23,35 +24,24 @@ else:
 
 # Check 2: Dependencies
 print("\n2. Checking dependencies...")
-try:
-    import fastapi
-    print("   ✅ FastAPI installed")
-except ImportError:
-    print("   ❌ FastAPI not installed")
-
-try:
-    import streamlit
-    print("   ✅ Streamlit installed")
-except ImportError:
-    print("   ❌ Streamlit not installed")
-
-try:
-    import langchain
-    print("   ✅ LangChain installed")
-except ImportError:
-    print("   ❌ LangChain not installed")
-
-try:
-    import langgraph
-    print("   ✅ LangGraph installed")
-except ImportError:
-    print("   ❌ LangGraph not installed")
+# find_spec only locates each package; importing them would take seconds
+dependencies = [
+    ("fastapi", "FastAPI"),
+    ("streamlit", "Streamlit"),
+    ("langchain", "LangChain"),
+    ("langgraph", "LangGraph"),
+    ("langchain_google_genai", "LangChain Google GenAI"),
+    ("httpx", "httpx"),
+    ("h2", "httpx HTTP/2 support (httpx[http2])"),
+    ("cachetools", "cachetools"),
+    ("orjson", "orjson")
+]
 
-try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    print("   ✅ LangChain Google GenAI installed")
-except ImportError:
-    print("   ❌ LangChain Google GenAI not installed")
+for module, name in dependencies:
+    if importlib.util.find_spec(module) is not None:
+        print(f"   ✅ {name} installed")
+    else:
+        print(f"   ❌ {name} not installed")
 
 # Check 3: Backend structure
 print("\n3. Checking backend structure...")
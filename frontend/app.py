@@ -20,15 +20,104 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load custom CSS
-css_file = Path(__file__).parent / "styles" / "custom.css"
-if css_file.exists():
-    with open(css_file) as f:
-        st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
 # API configuration
 API_URL = "http://localhost:8000"
 
+WELCOME_HTML = """
+    <div style='background: white; padding: 2rem; border-radius: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);'>
+        <h2 style='color: #667eea;'>👋 Welcome to AI Trip Planner!</h2>
+        <p style='font-size: 1.1rem; color: #666;'>
+            Our intelligent multi-agent system will help you plan the perfect trip:
+        </p>
+        <ul style='font-size: 1rem; color: #666; line-height: 2;'>
+            <li>🔍 <strong>Researcher Agent</strong> - Finds real attractions using live APIs</li>
+            <li>💰 <strong>Budget Agent</strong> - Analyzes costs with real 2024 data</li>
+            <li>📋 <strong>Planner Agent</strong> - Creates personalized day-by-day itineraries</li>
+        </ul>
+        <p style='font-size: 1.1rem; color: #667eea; margin-top: 1.5rem;'>
+            👈 Fill in your preferences in the sidebar and click "Plan My Trip" to get started!
+        </p>
+    </div>
+"""
+
+FEATURE_CARDS_HTML = (
+    """
+    <div style='background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); padding: 1.5rem; border-radius: 12px; text-align: center;'>
+        <h3>🌐 Live Data</h3>
+        <p>Real-time attraction data from OpenTripMap API</p>
+    </div>
+    """,
+    """
+    <div style='background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%); padding: 1.5rem; border-radius: 12px; text-align: center;'>
+        <h3>💵 Real Costs</h3>
+        <p>Accurate 2024 pricing from Numbeo & Budget Your Trip</p>
+    </div>
+    """,
+    """
+    <div style='background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); padding: 1.5rem; border-radius: 12px; text-align: center;'>
+        <h3>🤖 AI Agents</h3>
+        <p>Multi-agent collaboration with LangGraph</p>
+    </div>
+    """
+)
+
+
+@st.cache_resource
+def _load_css() -> str:
+    """Read the custom stylesheet once per server process"""
+    css_file = Path(__file__).parent / "styles" / "custom.css"
+    if not css_file.exists():
+        return ""
+    return css_file.read_text()
+
+
+# Load custom CSS
+css = _load_css()
+if css:
+    st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
+
+
+class _DegradedPlan(Exception):
+    """Raised from _post_plan for a response that must not be cached"""
+    
+    def __init__(self, body: dict):
+        super().__init__(body.get("error") or "No itinerary was generated")
+        self.body = body
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _post_plan(request_key: tuple) -> dict:
+    """
+    POST a trip request to the backend, caching responses for identical inputs
+    
+    Args:
+        request_key: (destination, num_days, budget_usd, travel_style, interests tuple)
+    
+    Returns:
+        API response
+    
+    Raises:
+        _DegradedPlan: The backend answered but reported an error or returned
+            no itinerary; raising keeps the response out of the cache
+    """
+    destination, num_days, budget_usd, travel_style, interests = request_key
+    response = requests.post(
+        f"{API_URL}/plan",
+        json={
+            "destination": destination,
+            "num_days": num_days,
+            "budget_usd": budget_usd,
+            "travel_style": travel_style,
+            "interests": list(interests)
+        },
+        timeout=300  # 5 minutes timeout
+    )
+    response.raise_for_status()
+    body = response.json()
+    if body.get("error") or not body.get("itinerary"):
+        raise _DegradedPlan(body)
+    return body
+
 
 def call_api(request_data: dict):
     """
@@ -41,13 +130,18 @@ def call_api(request_data: dict):
         API response
     """
     try:
-        response = requests.post(
-            f"{API_URL}/plan",
-            json=request_data,
-            timeout=300  # 5 minutes timeout
-        )
-        response.raise_for_status()
-        return response.json()
+        # Failures, including degraded plans, raise out of the cached call,
+        # so they are never cached
+        return _post_plan((
+            request_data["destination"],
+            request_data["num_days"],
+            request_data["budget_usd"],
+            request_data["travel_style"],
+            tuple(request_data["interests"])
+        ))
+    except _DegradedPlan as e:
+        # Shown like any other response (error plus any placeholder plan)
+        return e.body
     except requests.exceptions.ConnectionError:
         st.error("❌ Cannot connect to backend API. Make sure the backend server is running on http://localhost:8000")
         st.info("💡 Start the backend with: `cd backend && python main.py`")
@@ -63,6 +157,26 @@ def call_api(request_data: dict):
         return None
 
 
+def show_itinerary(itinerary: dict):
+    """
+    Display an itinerary with its JSON download button
+    
+    Args:
+        itinerary: Itinerary dictionary from backend
+    """
+    display_itinerary(itinerary)
+    
+    # Download button
+    itinerary_json = json.dumps(itinerary, indent=2)
+    destination = itinerary.get("destination", "trip")
+    st.download_button(
+        label="📥 Download Itinerary (JSON)",
+        data=itinerary_json,
+        file_name=f"itinerary_{destination.lower().replace(' ', '_')}.json",
+        mime="application/json"
+    )
+
+
 def main():
     """Main application"""
     
@@ -84,6 +198,10 @@ def main():
     
     # Main content area
     if user_inputs["plan_button"]:
+        # A new attempt replaces the last itinerary; it is stored again only
+        # if this plan succeeds, so reruns never show a previous trip
+        st.session_state.pop("itinerary", None)
+        
         # Validate inputs
         if not user_inputs["destination"]:
             st.error("❌ Please enter a destination")
@@ -128,16 +246,8 @@ def main():
                 
                 # Display itinerary
                 if result.get("itinerary"):
-                    display_itinerary(result["itinerary"])
-                    
-                    # Download button
-                    itinerary_json = json.dumps(result["itinerary"], indent=2)
-                    st.download_button(
-                        label="📥 Download Itinerary (JSON)",
-                        data=itinerary_json,
-                        file_name=f"itinerary_{user_inputs['destination'].lower().replace(' ', '_')}.json",
-                        mime="application/json"
-                    )
+                    st.session_state["itinerary"] = result["itinerary"]
+                    show_itinerary(result["itinerary"])
                 else:
                     st.warning("⚠️ No itinerary was generated")
                 
@@ -145,55 +255,21 @@ def main():
                 if result.get("error"):
                     st.error(f"❌ Error: {result['error']}")
     
+    elif not user_inputs["changed"] and "itinerary" in st.session_state:
+        # Rerun with the same inputs: show the last itinerary again
+        show_itinerary(st.session_state["itinerary"])
+    
     else:
         # Welcome message
-        st.markdown("""
-            <div style='background: white; padding: 2rem; border-radius: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);'>
-                <h2 style='color: #667eea;'>👋 Welcome to AI Trip Planner!</h2>
-                <p style='font-size: 1.1rem; color: #666;'>
-                    Our intelligent multi-agent system will help you plan the perfect trip:
-                </p>
-                <ul style='font-size: 1rem; color: #666; line-height: 2;'>
-                    <li>🔍 <strong>Researcher Agent</strong> - Finds real attractions using live APIs</li>
-                    <li>💰 <strong>Budget Agent</strong> - Analyzes costs with real 2024 data</li>
-                    <li>📋 <strong>Planner Agent</strong> - Creates personalized day-by-day itineraries</li>
-                </ul>
-                <p style='font-size: 1.1rem; color: #667eea; margin-top: 1.5rem;'>
-                    👈 Fill in your preferences in the sidebar and click "Plan My Trip" to get started!
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(WELCOME_HTML, unsafe_allow_html=True)
         
         # Features
         st.markdown("---")
         st.markdown("### ✨ Features")
         
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown("""
-                <div style='background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); padding: 1.5rem; border-radius: 12px; text-align: center;'>
-                    <h3>🌐 Live Data</h3>
-                    <p>Real-time attraction data from OpenTripMap API</p>
-                </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown("""
-                <div style='background: linear-gradient(135deg, #ffecd2 0%, #fcb69f 100%); padding: 1.5rem; border-radius: 12px; text-align: center;'>
-                    <h3>💵 Real Costs</h3>
-                    <p>Accurate 2024 pricing from Numbeo & Budget Your Trip</p>
-                </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown("""
-                <div style='background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); padding: 1.5rem; border-radius: 12px; text-align: center;'>
-                    <h3>🤖 AI Agents</h3>
-                    <p>Multi-agent collaboration with LangGraph</p>
-                </div>
-            """, unsafe_allow_html=True)
-
+        for col, card_html in zip(st.columns(3), FEATURE_CARDS_HTML):
+            with col:
+                st.markdown(card_html, unsafe_allow_html=True)
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,17 @@
 """
 Itinerary display component - Updated for structured data
 """
+import json
+from html import escape
+from typing import Any, Dict
 import streamlit as st
 
+MAX_VISIBLE_RECOMMENDATIONS = 5
+
+# Whole-dollar amounts, e.g. "$2,500"; bound once rather than parsing an
+# f-string format spec per value
+format_usd = "${:,.0f}".format
+
 
 def display_itinerary(itinerary_data: dict):
     """
@@ -20,39 +29,8 @@ def display_itinerary(itinerary_data: dict):
     st.markdown("# 🗺️ Your Personalized Itinerary")
     st.markdown("---")
     
-    # Trip overview
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("📍 Destination", itinerary_data.get("destination", "N/A"))
-    
-    with col2:
-        num_days = itinerary_data.get('num_days', itinerary_data.get('duration_days', 0))
-        st.metric("📅 Duration", f"{num_days} days")
-    
-    with col3:
-        total_budget = itinerary_data.get('total_budget', itinerary_data.get('budget_usd', 0))
-        st.metric("💰 Budget", f"${total_budget:,.0f}")
-    
-    with col4:
-        st.metric("✨ Style", itinerary_data.get("travel_style", "N/A").title())
-    
-    # Cost summary
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        total_cost = itinerary_data.get('total_cost', 0)
-        st.metric("💵 Total Cost", f"${total_cost:,.0f}")
-    
-    with col2:
-        budget_status = itinerary_data.get('budget_status', 'unknown')
-        status_emoji = "✅" if budget_status == "within_budget" else "⚠️"
-        st.metric(f"{status_emoji} Budget Status", budget_status.replace('_', ' ').title())
-    
-    with col3:
-        if total_cost and total_budget:
-            savings = total_budget - total_cost
-            st.metric("💰 Savings", f"${savings:,.0f}")
+    # Trip overview and cost summary in one element
+    st.markdown(build_kpi_html(itinerary_data), unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -62,8 +40,10 @@ def display_itinerary(itinerary_data: dict):
     if day_plans:
         st.markdown("## 📅 Day-by-Day Itinerary")
         
-        for day_plan in day_plans:
-            display_day_plan(day_plan)
+        # Only the first day starts open so the browser lays out one day
+        for idx, day_plan in enumerate(day_plans):
+            day = _render_day_plan(json.dumps(day_plan, sort_keys=True))
+            display_day_plan(day, expanded=(idx == 0))
     else:
         # Fallback to text-based itinerary
         itinerary_text = itinerary_data.get("itinerary_text", "")
@@ -78,91 +58,153 @@ def display_itinerary(itinerary_data: dict):
     if recommendations:
         st.markdown("---")
         st.markdown("## 💡 Recommendations & Tips")
-        for rec in recommendations:
-            st.markdown(f"- {rec}")
+        # Long LLM tip lists stay collapsed beyond the first few
+        visible = recommendations[:MAX_VISIBLE_RECOMMENDATIONS]
+        hidden = recommendations[MAX_VISIBLE_RECOMMENDATIONS:]
+        st.markdown("\n".join(f"- {rec}" for rec in visible))
+        if hidden:
+            with st.expander("Show more tips", expanded=False):
+                st.markdown("\n".join(f"- {rec}" for rec in hidden))
     
     # Data sources
     st.markdown("---")
     st.caption(f"🕐 Created: {itinerary_data.get('created_at', 'N/A')}")
 
 
-def display_day_plan(day_plan: dict):
+def build_kpi_html(itinerary_data: dict) -> str:
     """
-    Display a single day plan with activities
+    Build the trip overview and cost summary as one row of KPI cards
+    
+    Args:
+        itinerary_data: Itinerary dictionary from backend
+    
+    Returns:
+        KPI row HTML (styled by .kpi-row in styles/custom.css)
+    """
+    
+    num_days = itinerary_data.get('num_days', itinerary_data.get('duration_days', 0))
+    total_budget = itinerary_data.get('total_budget', itinerary_data.get('budget_usd', 0))
+    total_cost = itinerary_data.get('total_cost', 0)
+    budget_status = itinerary_data.get('budget_status', 'unknown')
+    status_emoji = "✅" if budget_status == "within_budget" else "⚠️"
+    
+    kpis = [
+        ("📍 Destination", itinerary_data.get("destination", "N/A")),
+        ("📅 Duration", f"{num_days} days"),
+        ("💰 Budget", format_usd(total_budget)),
+        ("✨ Style", itinerary_data.get("travel_style", "N/A").title()),
+        ("💵 Total Cost", format_usd(total_cost)),
+        (f"{status_emoji} Budget Status", budget_status.replace('_', ' ').title())
+    ]
+    if total_cost and total_budget:
+        kpis.append(("💰 Savings", format_usd(total_budget - total_cost)))
+    
+    cards = "".join(
+        f"<div class='kpi'><div class='kpi-label'>{label}</div>"
+        f"<div class='kpi-value'>{escape(str(value))}</div></div>"
+        for label, value in kpis
+    )
+    return f"<div class='kpi-row'>{cards}</div>"
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _render_day_plan(day_plan_json: str) -> Dict[str, Any]:
+    """
+    Build one day's expander title and markdown, memoized across reruns
+    
+    Days are cached individually, so an itinerary that shares days with an
+    earlier one only builds the days that differ.
+    
+    Args:
+        day_plan_json: Day plan serialized with sorted keys (the cache key)
+    
+    Returns:
+        Rendered day with title, summary, activities and total
+    """
+    return build_day_plan(json.loads(day_plan_json))
+
+
+def build_day_plan(day_plan: dict) -> Dict[str, Any]:
+    """
+    Build a single day plan's expander title and markdown
     
     Args:
         day_plan: Day plan dictionary
+    
+    Returns:
+        Dictionary with title, summary, activities (one markdown card each)
+        and total
     """
     
     day_num = day_plan.get('day', '?')
-    daily_cost = day_plan.get('daily_cost', 0)
+    daily_cost = format_usd(day_plan.get('daily_cost', 0))
     summary = day_plan.get('summary', '')
     date = day_plan.get('date', '')
+    activities = day_plan.get('activities', [])
     
-    # Create expander for the day
     title = f"📅 Day {day_num}"
     if date:
         title += f" - {date}"
-    title += f" (${daily_cost:,.0f})"
+    title += f" ({daily_cost})"
+    
+    return {
+        "title": title,
+        "summary": f"**{summary}**" if summary else "",
+        "activities": [
+            build_activity_markdown(activity, idx) for idx, activity in enumerate(activities, 1)
+        ],
+        "total": f"---\n\n**💵 Daily Total: {daily_cost}**"
+    }
+
+
+def display_day_plan(day: Dict[str, Any], expanded: bool = False):
+    """
+    Display a single rendered day plan
     
-    with st.expander(title, expanded=True):
-        # Summary
-        if summary:
-            st.markdown(f"**{summary}**")
-            st.markdown("")
-        
-        # Activities
-        activities = day_plan.get('activities', [])
+    Args:
+        day: Rendered day from build_day_plan
+        expanded: Whether the day starts expanded
+    """
+    with st.expander(day["title"], expanded=expanded):
+        if day["summary"]:
+            st.markdown(day["summary"])
         
-        if activities:
-            for idx, activity in enumerate(activities, 1):
-                display_activity(activity, idx)
-        else:
+        if not day["activities"]:
             st.info("No activities planned for this day")
         
-        # Daily cost
-        st.markdown("---")
-        st.markdown(f"**💵 Daily Total: ${daily_cost:,.0f}**")
+        # Native bordered cards; no raw HTML for the browser to parse
+        for card in day["activities"]:
+            with st.container(border=True):
+                st.markdown(card)
+        
+        st.markdown(day["total"])
 
 
-def display_activity(activity: dict, idx: int):
+def build_activity_markdown(activity: dict, idx: int) -> str:
     """
-    Display a single activity
+    Build the markdown for a single activity card
     
     Args:
         activity: Activity dictionary
         idx: Activity index
+    
+    Returns:
+        Activity card markdown
     """
     
-    name = activity.get('name', 'Activity')
-    time = activity.get('time', '')
-    duration = activity.get('duration_hours', 0)
-    cost = activity.get('cost_usd', 0)
+    lines = [f"#### ⏰ {activity.get('time', '')} - {activity.get('name', 'Activity')}"]
+    
     description = activity.get('description', '')
+    if description:
+        lines.append(f"📝 {description}")
+    
     reasoning = activity.get('reasoning', '')
+    if reasoning:
+        lines.append(f"💡 *Why: {reasoning}*")
+    
+    lines.append(
+        f"**⏱️ {activity.get('duration_hours', 0)}h** · "
+        f"**💵 {format_usd(activity.get('cost_usd', 0))}**"
+    )
     
-    # Activity card
-    st.markdown(f"""
-    <div style='background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%); 
-                padding: 1rem; 
-                border-radius: 10px; 
-                margin-bottom: 1rem;
-                border-left: 4px solid #667eea;'>
-        <h4 style='margin: 0; color: #667eea;'>⏰ {time} - {name}</h4>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Details
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        if description:
-            st.markdown(f"📝 {description}")
-        if reasoning:
-            st.markdown(f"💡 *Why: {reasoning}*")
-    
-    with col2:
-        st.markdown(f"**⏱️ {duration}h**")
-        st.markdown(f"**💵 ${cost:,.0f}**")
-    
-    st.markdown("")
+    return "\n\n".join(lines)
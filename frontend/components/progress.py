@@ -1,31 +1,55 @@
 """
 Progress tracking component
 """
-import streamlit as st
 import time
+from html import escape
+from typing import Any, Callable, Optional
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+# Minimum seconds between progress renders
+PROGRESS_MIN_INTERVAL = 0.1
 
+# Agent -> (icon, share of the workflow done once it is running)
+_AGENT_INFO = {
+    "researcher": ("🔍", 0.33),
+    "budget": ("💰", 0.66),
+    "planner": ("📋", 1.0)
+}
+_DEFAULT_AGENT_INFO = ("⚙️", 1.0)
 
-def show_progress(status: str, agent: str = ""):
+
+def show_progress(slot: DeltaGenerator, status: str, agent: str = "", final: bool = False):
     """
     Show progress indicator for agent execution
     
+    The whole card is one markdown element, so repeated calls patch the
+    same placeholder instead of stacking new widgets. Updates closer than
+    PROGRESS_MIN_INTERVAL apart are dropped unless final is set.
+    
     Args:
+        slot: Placeholder from st.empty(), created once by the caller
         status: Current status message
         agent: Current agent name
+        final: Always render (use for the last update)
     """
     
-    agent_emojis = {
-        "researcher": "🔍",
-        "budget": "💰",
-        "planner": "📋"
-    }
+    now = time.monotonic()
+    last_ts = st.session_state.setdefault("_progress_last_ts", 0.0)
+    if now - last_ts < PROGRESS_MIN_INTERVAL and not final:
+        return
+    st.session_state["_progress_last_ts"] = now
     
-    emoji = agent_emojis.get(agent.lower(), "⚙️")
+    emoji, pct = _AGENT_INFO.get(agent.lower(), _DEFAULT_AGENT_INFO)
     
-    with st.container():
-        st.markdown(f"### {emoji} {agent.title()} Agent")
-        st.info(status)
-        st.progress(0.33 if agent == "researcher" else 0.66 if agent == "budget" else 1.0)
+    slot.markdown(
+        f"<div class='agent-progress'>"
+        f"<h3>{emoji} {escape(agent.title())} Agent</h3>"
+        f"<p>{escape(status)}</p>"
+        f"<progress value='{pct}' max='1' style='width:100%'></progress>"
+        f"</div>",
+        unsafe_allow_html=True
+    )
 
 
 def show_agent_status(agent: str, message: str, completed: bool = False):
@@ -38,19 +62,21 @@ def show_agent_status(agent: str, message: str, completed: bool = False):
         completed: Whether the agent has completed
     """
     
-    icons = {
-        "researcher": "🔍",
-        "budget": "💰",
-        "planner": "📋"
-    }
-    
-    icon = icons.get(agent.lower(), "⚙️")
+    icon, _ = _AGENT_INFO.get(agent.lower(), _DEFAULT_AGENT_INFO)
     status_icon = "✅" if completed else "⏳"
     
     st.markdown(f"{status_icon} **{icon} {agent.title()}**: {message}")
 
 
-def show_loading_animation():
-    """Show loading animation"""
+def show_loading_animation(work: Optional[Callable[[], Any]] = None) -> Any:
+    """
+    Show loading animation while work runs
+    
+    Args:
+        work: Optional callable to run under the spinner
+    
+    Returns:
+        The result of work, or None if no work was given
+    """
     with st.spinner("🌍 Planning your perfect trip..."):
-        time.sleep(0.5)
+        return work() if work is not None else None
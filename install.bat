@@ -3,7 +3,7 @@ echo Installing Trip Planner Dependencies...
 echo.
 
 echo Step 1: Installing core dependencies...
-pip install fastapi==0.109.0 uvicorn[standard]==0.27.0 python-dotenv==1.0.0 requests==2.31.0 geopy==2.4.1 streamlit==1.40.1 python-multipart==0.0.6
+pip install fastapi==0.109.0 uvicorn[standard]==0.27.0 python-dotenv==1.0.0 requests==2.31.0 httpx[http2]==0.27.2 geopy==2.4.1 streamlit==1.40.1 python-multipart==0.0.6 cachetools==5.5.0 orjson==3.10.11
 
 echo.
 echo Step 2: Installing Pydantic...
@@ -15,7 +15,7 @@ pip install google-generativeai==0.8.3
 
 echo.
 echo Step 4: Installing LangChain...
-pip install langchain-core==0.3.15 langchain-community==0.3.5 langchain-google-genai==2.0.4 langchain==0.3.7
+pip install langchain-core==0.3.15 langchain-community==0.3.5 langchain-google-genai==2.0.7 langchain==0.3.7
 
 echo.
 echo Step 5: Installing LangGraph...